@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+import logging
+from typing import NamedTuple
+import numpy as np
+
+PRODUCTS_FILE = os.environ.get("ADVANCE_PRODUCTS_FILE", "data/advance_products.json")
+# Seconds between checks of the product file for changes
+RELOAD_INTERVAL = float(os.environ.get("ADVANCE_PRODUCTS_RELOAD_INTERVAL", "5"))
+ANY = "*"
+
+# Used when no product file exists: 50% of monthly salary, 2% fee, for everyone
+DEFAULT_TIERS = [
+    {"employer": ANY, "pay_frequency": ANY, "min_monthly_salary": 0, "max_advance_percentage": 0.5, "fee_percentage": 0.02}
+]
+
+logger = logging.getLogger(__name__)
+
+
+class Bands(NamedTuple):
+    min_monthly_salary: np.ndarray
+    max_advance_percentage: np.ndarray
+    fee_percentage: np.ndarray
+
+
+class ProductTable:
+    """Tiers compiled into sorted salary band arrays per (employer, pay frequency).
+
+    A lookup falls back from the exact pair to the employer's wildcard, then the
+    frequency's wildcard, then the catch-all, and resolves the band with a binary search.
+    """
+
+    def __init__(self, tiers: list[dict]):
+        grouped = {}
+        for tier in tiers:
+            key = (str(tier.get("employer", ANY)).lower(), str(tier.get("pay_frequency", ANY)).lower())
+            grouped.setdefault(key, []).append(tier)
+        self.groups = {}
+        for key, group in grouped.items():
+            group.sort(key=lambda tier: tier["min_monthly_salary"])
+            self.groups[key] = Bands(*(
+                np.array([tier[field] for tier in group], dtype=np.float64) for field in Bands._fields
+            ))
+
+    def resolve(self, employer: str, pay_frequency: str) -> Bands | None:
+        employer = employer.lower()
+        for key in ((employer, pay_frequency), (employer, ANY), (ANY, pay_frequency), (ANY, ANY)):
+            bands = self.groups.get(key)
+            if bands is not None:
+                return bands
+        return None
+
+    def lookup(self, monthly_salary: float, pay_frequency: str, employer: str | None = None) -> tuple[float, float]:
+        """(max advance percentage, fee percentage) for one salary; (0, 0) if no band applies."""
+        bands = self.resolve(employer or ANY, pay_frequency.lower())
+        if bands is None:
+            return 0.0, 0.0
+        index = int(np.searchsorted(bands.min_monthly_salary, monthly_salary, side="right")) - 1
+        if index < 0:
+            return 0.0, 0.0
+        return float(bands.max_advance_percentage[index]), float(bands.fee_percentage[index])
+
+    def lookup_many(self, monthly_salary: np.ndarray, pay_frequency: np.ndarray, employer: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized lookup; pay_frequency must already be lower case."""
+        caps = np.zeros(len(monthly_salary))
+        fees = np.zeros(len(monthly_salary))
+        if employer is None:
+            keys, inverse = np.unique(pay_frequency.astype(str), return_inverse=True)
+            pairs = [(ANY, frequency) for frequency in keys.tolist()]
+        else:
+            keys, inverse = np.unique(np.char.add(np.char.add(np.char.lower(employer.astype(str)), "\x1f"), pay_frequency.astype(str)), return_inverse=True)
+            pairs = [key.split("\x1f", 1) for key in keys.tolist()]
+        # One binary search per distinct (employer, frequency) in the batch
+        for group, pair in enumerate(pairs):
+            bands = self.resolve(*pair)
+            if bands is None:
+                continue
+            rows = inverse == group
+            index = np.searchsorted(bands.min_monthly_salary, monthly_salary[rows], side="right") - 1
+            covered = index >= 0
+            caps[rows] = np.where(covered, bands.max_advance_percentage[index.clip(0)], 0.0)
+            fees[rows] = np.where(covered, bands.fee_percentage[index.clip(0)], 0.0)
+        return caps, fees
+
+
+class ProductRules:
+    """The current ProductTable, swapped atomically when the product file changes."""
+
+    def __init__(self, products_file: str = PRODUCTS_FILE):
+        self.products_file = products_file
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.table = ProductTable(DEFAULT_TIERS)
+        self.reload()
+
+    def reload(self) -> bool:
+        """Recompile the product file if it changed since the last load; returns True if it did."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(self.products_file)
+            except FileNotFoundError:
+                return False
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature == self._signature:
+                return False
+            try:
+                with open(self.products_file, "r") as f:
+                    table = ProductTable(json.load(f)["tiers"])
+            except Exception as e:
+                # Keep serving the previous table rather than failing requests on a bad edit
+                logger.error(f"Error loading advance products: {e}")
+                return False
+            self.table = table
+            self._signature = signature
+            logger.info(f"Advance products loaded from {self.products_file}")
+            return True
+
+    def current(self) -> ProductTable:
+        if time.monotonic() - self._checked_at > RELOAD_INTERVAL:
+            self.reload()
+        return self.table
+
+
+product_rules = ProductRules()
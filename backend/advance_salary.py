@@ -1,20 +1,144 @@
-from fastapi import APIRouter, HTTPException
-from models import SalaryAdvanceRequest, SalaryAdvanceResponse
+import asyncio
+import csv
+import io
+import logging
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from models import SalaryAdvanceRequest, SalaryAdvanceResponse, SalaryAdvanceBatchRequest, SalaryAdvanceBatchResponse, ProductReloadResponse
+from csv_stream import CsvChunkReader
+from advance_rules import product_rules
+import numpy as np
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-# Constants
-MAX_ADVANCE_PERCENTAGE = 0.5  # 50% of monthly salary
-ADVANCE_FEE_PERCENTAGE = 0.02  # 2% fee
+# Constants; advance caps and fees come from the product table in advance_rules
+PAY_FREQUENCY_RATES = {
+    "monthly": 1,
+    "biweekly": 26 / 12,
+    "weekly": 52 / 12
+}
+# Payroll rows scored per vectorized pass; bounds the memory of a batch run
+PAYROLL_BATCH_ROWS = 10_000
+PAYROLL_COLUMNS = ("gross_salary", "pay_frequency", "requested_amount")
+ADVANCE_RESULT_COLUMNS = ("eligible", "max_advance", "approved_amount", "fee", "total_repayable", "monthly_salary", "error")
 
 # function to convert salary to monthly amount based on pay frequency
 def convert_to_monthly(salary: float, frequency: str) -> float:
-    conversion_rates = {
-        "monthly": 1,
-        "biweekly": 26 / 12,
-        "weekly": 52 / 12
+    return salary * PAY_FREQUENCY_RATES[frequency.lower()]
+
+# vectorized calculate_advance for a whole payroll; invalid rows are flagged instead of failing the batch
+def calculate_advances(gross_salary: np.ndarray, pay_frequency: np.ndarray, requested_amount: np.ndarray, employer: np.ndarray | None = None) -> dict:
+    frequency = np.char.lower(np.asarray(pay_frequency, dtype=str))
+    rates = np.full(len(frequency), np.nan)
+    for name, rate in PAY_FREQUENCY_RATES.items():
+        rates[frequency == name] = rate
+
+    error = np.full(len(frequency), "", dtype=object)
+    error[np.isnan(rates)] = "Unknown pay frequency."
+    error[~(requested_amount > 0)] = "Requested amount must be greater than zero."
+    error[~(gross_salary > 0)] = "Gross salary must be greater than zero."
+    error[np.isnan(gross_salary) | np.isnan(requested_amount)] = "Expected a number for gross salary and requested amount."
+    valid = error == ""
+
+    monthly_salary = np.where(valid, gross_salary * rates, 0.0)
+    max_advance_percentage, fee_percentage = product_rules.current().lookup_many(monthly_salary, frequency, employer)
+    max_advance = monthly_salary * max_advance_percentage
+    eligible = valid & (requested_amount <= max_advance)
+    fee = np.where(eligible, requested_amount * fee_percentage, 0.0)
+
+    return {
+        "eligible": eligible,
+        "max_advance": np.round(max_advance, 2),
+        "approved_amount": np.where(eligible, np.round(requested_amount, 2), 0.0),
+        "fee": np.round(fee, 2),
+        "total_repayable": np.where(eligible, np.round(requested_amount + fee, 2), 0.0),
+        "monthly_salary": np.round(monthly_salary, 2),
+        "error": error,
     }
-    return salary * conversion_rates[frequency.lower()]
+
+def score_payroll_rows(header: list[str], rows: list[list[str]]) -> str:
+    # One batch of payroll CSV rows in, the matching result CSV rows out
+    indexes = [header.index(column) for column in PAYROLL_COLUMNS]
+    extra = [index for index, column in enumerate(header) if column not in PAYROLL_COLUMNS]
+    columns = list(zip(*([fields[index] if index < len(fields) else "" for index in indexes] for fields in rows)))
+    gross_salary = np.array([to_float(value) for value in columns[0]])
+    requested_amount = np.array([to_float(value) for value in columns[2]])
+    employer = None
+    if "employer" in header:
+        index = header.index("employer")
+        employer = np.array([fields[index] if index < len(fields) else "" for fields in rows])
+    result = calculate_advances(gross_salary, np.array(columns[1]), requested_amount, employer)
+
+    buffer = io.StringIO()
+    passthrough = ([fields[index] if index < len(fields) else "" for index in extra] for fields in rows)
+    csv.writer(buffer, lineterminator="\n").writerows(
+        passthrough_fields + list(result_fields)
+        for passthrough_fields, result_fields in zip(passthrough, zip(*(result[column].tolist() for column in ADVANCE_RESULT_COLUMNS)))
+    )
+    return buffer.getvalue()
+
+def to_float(value: str) -> float:
+    # Unparsable amounts score as invalid rows rather than failing the whole payroll
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+async def read_payroll_header(chunks) -> tuple[CsvChunkReader, list[list[str]]]:
+    # Reads just far enough into the body to know the columns
+    reader = CsvChunkReader()
+    rows = []
+    async for chunk in chunks:
+        rows.extend(reader.feed(chunk))
+        if reader.header is not None:
+            return reader, rows
+    rows.extend(reader.close())
+    return reader, rows
+
+class PayrollResponse(StreamingResponse):
+    """Streams results while the request body is still arriving.
+
+    StreamingResponse watches for a client disconnect by reading receive(), which would
+    swallow the body chunks score_payroll is still waiting for; it only starts watching
+    once the whole body has been read.
+    """
+
+    def __init__(self, content, body_read: asyncio.Event, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_read = body_read
+
+    async def listen_for_disconnect(self, receive):
+        await self.body_read.wait()
+        await super().listen_for_disconnect(receive)
+
+async def score_payroll(reader: CsvChunkReader, rows: list[list[str]], chunks, body_read: asyncio.Event):
+    # Scoring a batch is CPU-bound numpy work, so it runs off the event loop
+    header = [column for column in reader.header if column not in PAYROLL_COLUMNS] + list(ADVANCE_RESULT_COLUMNS)
+    yield ",".join(header) + "\n"
+    failure = None
+    try:
+        async for chunk in chunks:
+            rows.extend(reader.feed(chunk))
+            if len(rows) >= PAYROLL_BATCH_ROWS:
+                yield await run_in_threadpool(score_payroll_rows, reader.header, rows)
+                rows = []
+        rows.extend(reader.close())
+    except (ValueError, UnicodeDecodeError) as e:
+        # The 200 and earlier batches are already sent, so the failure goes out as a last row;
+        # a bad file must never look like a shorter payroll
+        logger.warning(f"Payroll scoring stopped: {e}")
+        failure = f"Invalid payroll file: {str(e).rstrip('.')}. No rows after this one were scored."
+    finally:
+        body_read.set()
+    if rows:
+        yield await run_in_threadpool(score_payroll_rows, reader.header, rows)
+    if failure:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow([""] * (len(header) - 1) + [failure])
+        yield buffer.getvalue()
 
 @router.post("/calculate_salary_advance", response_model=SalaryAdvanceResponse)
 def calculate_advance(request: SalaryAdvanceRequest):
@@ -25,11 +149,12 @@ def calculate_advance(request: SalaryAdvanceRequest):
 
     # Calculate monthly salary based on pay frequency
     monthly_salary = convert_to_monthly(request.gross_salary, request.pay_frequency)
-    max_advance = monthly_salary * MAX_ADVANCE_PERCENTAGE
+    max_advance_percentage, fee_percentage = product_rules.current().lookup(monthly_salary, request.pay_frequency, request.employer)
+    max_advance = monthly_salary * max_advance_percentage
 
     # Checking if the requested amount is eligible for advance
     is_eligible = request.requested_amount <= max_advance
-    fee = request.requested_amount * ADVANCE_FEE_PERCENTAGE if is_eligible else 0
+    fee = request.requested_amount * fee_percentage if is_eligible else 0
     total_repayable = request.requested_amount + fee if is_eligible else 0
 
     return SalaryAdvanceResponse(
@@ -40,3 +165,38 @@ def calculate_advance(request: SalaryAdvanceRequest):
         total_repayable=round(total_repayable, 2),
         monthly_salary=round(monthly_salary, 2)
     )
+
+@router.post("/calculate_salary_advance/batch", response_model=SalaryAdvanceBatchResponse)
+async def calculate_advance_batch(request: Request):
+    # Columnar JSON is scored in one pass and answered in kind
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            payroll = SalaryAdvanceBatchRequest.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+        if not len(payroll.gross_salary) == len(payroll.pay_frequency) == len(payroll.requested_amount):
+            raise HTTPException(status_code=400, detail="gross_salary, pay_frequency and requested_amount must have the same length.")
+        employer = None if payroll.employer is None else np.array(payroll.employer)
+        if employer is not None and len(employer) != len(payroll.gross_salary):
+            raise HTTPException(status_code=400, detail="employer must have the same length as gross_salary.")
+        result = await run_in_threadpool(calculate_advances, np.array(payroll.gross_salary), np.array(payroll.pay_frequency), np.array(payroll.requested_amount), employer)
+        return SalaryAdvanceBatchResponse(**{column: values.tolist() for column, values in result.items()})
+
+    # A payroll CSV is scored in batches while it streams in, and the results stream back out
+    chunks = request.stream()
+    try:
+        reader, rows = await read_payroll_header(chunks)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid payroll file: {str(e)}")
+    if reader.header is None:
+        raise HTTPException(status_code=400, detail="Payroll file is empty.")
+    missing = [column for column in PAYROLL_COLUMNS if column not in reader.header]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Payroll file is missing columns: {', '.join(missing)}.")
+
+    body_read = asyncio.Event()
+    return PayrollResponse(score_payroll(reader, rows, chunks, body_read), body_read, media_type="text/csv")
+
+@router.post("/advance-products/reload", response_model=ProductReloadResponse)
+def reload_advance_products():
+    return ProductReloadResponse(reloaded=product_rules.reload())
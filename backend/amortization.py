@@ -0,0 +1,148 @@
+from typing import NamedTuple
+import numpy as np
+
+
+SCHEDULE_COLUMNS = ("Period", "Payment", "Principal", "Interest", "Remaining Balance")
+
+# Number of closed-form passes before the remaining periods are finished one by one
+MAX_PASSES = 8
+# Shortest block of periods predicted in one go
+MIN_BLOCK = 16
+# Periods computed at a time when a schedule is streamed
+BLOCK_SIZE = 256
+
+
+class AmortizationSchedule(NamedTuple):
+    periods: np.ndarray
+    payment: np.ndarray
+    principal: np.ndarray
+    interest: np.ndarray
+    remaining_balance: np.ndarray
+    total_interest: float
+    total_payment: float
+
+
+def _step(balance, monthly_rate: float, monthly_payment: float):
+    # One period of the cent-rounded recurrence, applied element-wise
+    interest = np.round(balance * monthly_rate, 2)
+    principal = np.round(monthly_payment - interest, 2)
+    return interest, principal, np.round(balance - principal, 2)
+
+
+def _predict(seed: float, monthly_rate: float, payment: float, residuals: np.ndarray) -> np.ndarray:
+    # Closed-form annuity balances from `seed`, corrected by the known cent rounding residuals
+    steps = np.arange(len(residuals) + 1)
+    carry = np.zeros(len(residuals) + 1)
+    if monthly_rate == 0:
+        base = seed - payment * steps
+        carry[1:] = np.cumsum(residuals)
+    else:
+        growth = (1 + monthly_rate) ** steps
+        base = seed * growth - payment * (growth - 1) / monthly_rate
+        carry[1:] = np.cumsum(residuals / growth[:-1]) * growth[:-1]
+    return base + carry
+
+
+def _block_balances(balances: np.ndarray, monthly_rate: float, monthly_payment: float):
+    # Fill balances[1:] from balances[0] by predicting and verifying the whole block
+    count = len(balances)
+    residuals = np.zeros(count - 1)
+    payment = float(np.round(monthly_payment, 2))
+    start = 0
+
+    for _ in range(MAX_PASSES):
+        if start >= count - 1:
+            return
+        guess = _predict(balances[start], monthly_rate, payment, residuals[start:])
+        balances[start + 1:] = np.round(guess[1:], 2)
+
+        current = balances[start:-1]
+        interest, _, following = _step(current, monthly_rate, monthly_payment)
+        mismatch = np.flatnonzero(following != balances[start + 1:])
+        if mismatch.size == 0:
+            return
+
+        residuals[start:] = interest - current * monthly_rate
+        first = start + int(mismatch[0])
+        balances[first + 1] = following[mismatch[0]]
+        start = first + 1
+
+    # Rates that overflow the closed form fall back to the plain recurrence
+    for i in range(start, count - 1):
+        balances[i + 1] = _step(balances[i], monthly_rate, monthly_payment)[2]
+
+
+def opening_balances(principal: float, monthly_rate: float, term_months: int, monthly_payment: float) -> np.ndarray:
+    """Balance at the start of each period, identical to rounding period by period.
+
+    The closed-form formula predicts every balance of a block at once; the prediction
+    is then checked against the rounded recurrence in a single vectorized step, and
+    only the suffix after the first mismatch is predicted again. Blocks are kept short
+    enough that compound growth at most quadruples a rounding error, which keeps the
+    number of passes per block small.
+    """
+    balances = np.empty(term_months)
+    if term_months == 0:
+        return balances
+    balances[0] = principal
+    block = term_months
+    if monthly_rate > 0:
+        block = max(MIN_BLOCK, int(np.log(4) / np.log1p(monthly_rate)))
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        for start in range(0, term_months - 1, block):
+            _block_balances(balances[start:start + block + 1], monthly_rate, monthly_payment)
+    return balances
+
+
+def _schedule_from_balances(balances: np.ndarray, monthly_rate: float, monthly_payment: float, first_period: int = 1, payoff: bool = True) -> AmortizationSchedule:
+    count = len(balances)
+    interest, principal_paid, remaining = _step(balances, monthly_rate, monthly_payment)
+    payment = np.full(count, np.round(monthly_payment, 2))
+
+    # The final period pays off whatever balance is left
+    if payoff and count:
+        principal_paid[-1] = balances[-1]
+        payment[-1] = np.round(balances[-1] + interest[-1], 2)
+        remaining[-1] = 0.0
+
+    return AmortizationSchedule(
+        periods=np.arange(first_period, first_period + count),
+        payment=payment,
+        principal=principal_paid,
+        interest=interest,
+        remaining_balance=remaining,
+        total_interest=float(np.round(np.sum(interest), 2)),
+        total_payment=float(np.round(np.sum(payment), 2)),
+    )
+
+
+def amortize(principal: float, monthly_rate: float, term_months: int, monthly_payment: float) -> AmortizationSchedule:
+    balances = opening_balances(principal, monthly_rate, term_months, monthly_payment)
+    return _schedule_from_balances(balances, monthly_rate, monthly_payment)
+
+
+def iter_amortize(principal: float, monthly_rate: float, term_months: int, monthly_payment: float, block_size: int = BLOCK_SIZE):
+    """Yield the schedule of `amortize` in blocks of at most `block_size` periods.
+
+    Each block is seeded with the rounded balance the previous one ended on, so the
+    rows are identical to a single call while memory stays bounded by the block.
+    """
+    balance = principal
+    for start in range(0, term_months, block_size):
+        count = min(block_size, term_months - start)
+        balances = opening_balances(balance, monthly_rate, count, monthly_payment)
+        block = _schedule_from_balances(balances, monthly_rate, monthly_payment, start + 1, payoff=start + count == term_months)
+        yield block
+        balance = block.remaining_balance[-1]
+
+
+def schedule_records(schedule: AmortizationSchedule) -> list[dict]:
+    columns = (
+        schedule.periods.tolist(),
+        schedule.payment.tolist(),
+        schedule.principal.tolist(),
+        schedule.interest.tolist(),
+        schedule.remaining_balance.tolist(),
+    )
+    return [dict(zip(SCHEDULE_COLUMNS, row)) for row in zip(*columns)]
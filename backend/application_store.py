@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+import numpy as np
+from amortization import AmortizationSchedule, SCHEDULE_COLUMNS
+
+APPLICATION_DB_FILE = os.environ.get("APPLICATION_DB_FILE", "data/loan_applications.db")
+
+# Applicant fields returned by list and search, in table column order
+SUMMARY_FIELDS = (
+    "id", "submitted_at", "status", "customer_email",
+    "house_ownership", "salary_deduction_approval", "dependents", "employment_duration",
+    "principal", "monthly_rate", "term_months", "monthly_payment",
+    "schedule_rows", "schedule_verified",
+)
+
+
+def encode_schedule(values: np.ndarray) -> bytes:
+    # (rows, 5) schedule as five little-endian float64 columns back to back, the
+    # same layout the v4 endpoint serves as application/vnd.schedule.float64
+    return np.ascontiguousarray(values.T, dtype="<f8").tobytes()
+
+
+def decode_schedule(blob: bytes) -> AmortizationSchedule:
+    periods, payment, principal, interest, remaining = np.frombuffer(blob, dtype="<f8").reshape(len(SCHEDULE_COLUMNS), -1)
+    return AmortizationSchedule(
+        periods=periods.astype(np.int64),
+        payment=payment,
+        principal=principal,
+        interest=interest,
+        remaining_balance=remaining,
+        total_interest=float(np.round(np.sum(interest), 2)),
+        total_payment=float(np.round(np.sum(payment), 2)),
+    )
+
+
+def utc_text(moment: datetime) -> str:
+    # Stored as fixed-width UTC text so string order is time order; naive times count as UTC
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.isoformat(timespec="microseconds")
+
+
+class LoanApplicationStore:
+    """Submitted loan applications in SQLite (WAL), queried by customer, status and date.
+
+    Applicant fields live in an indexed table that list and search scan with keyset
+    pagination on the id. Schedules are kept apart as columnar float64 blobs keyed on
+    the application, so listings never read them; they are loaded one at a time on
+    request. Each thread keeps its own connection.
+    """
+
+    def __init__(self, db_file: str = APPLICATION_DB_FILE):
+        self.db_file = db_file
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+        self.connection().executescript("""
+            CREATE TABLE IF NOT EXISTS applications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                submitted_at TEXT NOT NULL,
+                status TEXT NOT NULL,
+                customer_email TEXT,
+                house_ownership TEXT NOT NULL,
+                salary_deduction_approval TEXT NOT NULL,
+                dependents INTEGER NOT NULL,
+                employment_duration TEXT NOT NULL,
+                principal REAL,
+                monthly_rate REAL,
+                term_months INTEGER,
+                monthly_payment REAL,
+                schedule_rows INTEGER NOT NULL,
+                schedule_verified INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS applications_customer ON applications (customer_email, id);
+            CREATE INDEX IF NOT EXISTS applications_status ON applications (status, id);
+            CREATE INDEX IF NOT EXISTS applications_submitted ON applications (submitted_at, id);
+            CREATE TABLE IF NOT EXISTS application_schedules (
+                application_id INTEGER PRIMARY KEY REFERENCES applications (id),
+                columns BLOB NOT NULL
+            );
+        """)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def insert(self, application: dict, schedule: np.ndarray | None = None) -> int:
+        """Store an application and its parsed schedule rows; returns the new id."""
+        record = dict(application, submitted_at=utc_text(datetime.now(timezone.utc)), status="submitted")
+        fields = [field for field in SUMMARY_FIELDS if field != "id"]
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute(
+                f"INSERT INTO applications ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+                [record.get(field) for field in fields],
+            )
+            if schedule is not None and len(schedule):
+                conn.execute(
+                    "INSERT INTO application_schedules (application_id, columns) VALUES (?, ?)",
+                    (cursor.lastrowid, encode_schedule(schedule)),
+                )
+        return cursor.lastrowid
+
+    def get(self, application_id: int) -> dict | None:
+        row = self.connection().execute(
+            f"SELECT {', '.join(SUMMARY_FIELDS)} FROM applications WHERE id = ?", (application_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def search(self, customer_email: str | None = None, status: str | None = None,
+               submitted_from: datetime | None = None, submitted_to: datetime | None = None,
+               before: int | None = None, limit: int = 100) -> list[dict]:
+        """Newest first; pass the last id of a page as `before` to get the next one."""
+        conditions, parameters = [], []
+        for clause, value in (
+            ("customer_email = ?", customer_email),
+            ("status = ?", status),
+            ("submitted_at >= ?", None if submitted_from is None else utc_text(submitted_from)),
+            ("submitted_at < ?", None if submitted_to is None else utc_text(submitted_to)),
+            ("id < ?", before),
+        ):
+            if value is not None:
+                conditions.append(clause)
+                parameters.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.connection().execute(
+            f"SELECT {', '.join(SUMMARY_FIELDS)} FROM applications {where} ORDER BY id DESC LIMIT ?", (*parameters, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def schedule(self, application_id: int) -> AmortizationSchedule | None:
+        row = self.connection().execute(
+            "SELECT columns FROM application_schedules WHERE application_id = ?", (application_id,)
+        ).fetchone()
+        return decode_schedule(row[0]) if row else None
+
+    def set_status(self, application_id: int, status: str) -> bool:
+        cursor = self.connection().execute("UPDATE applications SET status = ? WHERE id = ?", (status, application_id))
+        return cursor.rowcount > 0
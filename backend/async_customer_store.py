@@ -0,0 +1,96 @@
+import asyncio
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from customer_store import CustomerStore
+
+# Most inserts committed together in one transaction
+MAX_BATCH = int(os.environ.get("CUSTOMER_WRITE_BATCH", "500"))
+READ_THREADS = int(os.environ.get("CUSTOMER_READ_THREADS", "4"))
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCustomerStore:
+    """Non-blocking front for a CustomerStore.
+
+    Inserts are queued and a single writer task commits whatever has accumulated as
+    one batch (group commit), so concurrent saves share a transaction and its fsync.
+    Blocking I/O runs on this store's own threads, never on FastAPI's shared
+    threadpool, so a slow disk cannot starve the calculator endpoints.
+    """
+
+    def __init__(self, store: CustomerStore, max_batch: int = MAX_BATCH):
+        self.store = store
+        self.max_batch = max_batch
+        self.batches = 0
+        self.batched_writes = 0
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="customer-writer")
+        self._readers = ThreadPoolExecutor(max_workers=READ_THREADS, thread_name_prefix="customer-reader")
+        self._queue = None
+        self._loop = None
+        self._writer_task = None
+        self._batch = []
+
+    async def get(self, email: str) -> dict | None:
+        return await asyncio.get_running_loop().run_in_executor(self._readers, self.store.get, email)
+
+    async def insert(self, record: dict) -> bool:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queue and writer task belong to the event loop that uses them
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._writer_task = loop.create_task(self._write_batches(self._queue))
+            self._writer_task.add_done_callback(self._writer_stopped)
+        result = loop.create_future()
+        self._queue.put_nowait((record, result))
+        return await result
+
+    async def insert_many(self, records: list[dict]) -> list[bool]:
+        # Bulk batches are already large, so they skip the queue but share the single writer thread
+        return await asyncio.get_running_loop().run_in_executor(self._writer, self.store.insert_many_results, records)
+
+    async def _write_batches(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            self._batch = batch
+            records = [record for record, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._writer, self.store.insert_many_results, records)
+            except Exception as e:
+                logger.error(f"Error saving customer batch: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.batched_writes += len(batch)
+            for (_, future), inserted in zip(batch, results):
+                if not future.done():
+                    future.set_result(inserted)
+            self._batch = []
+
+    def _writer_stopped(self, task: asyncio.Task):
+        # The writer only ever stops by being cancelled or crashing; whatever it had
+        # not committed yet must fail instead of leaving its callers waiting forever
+        if task is not self._writer_task:
+            return
+        if task.cancelled():
+            # Normal when the event loop shuts down
+            error = RuntimeError("Customer writer stopped")
+        else:
+            error = task.exception()
+            logger.error(f"Customer writer crashed: {error!r}")
+        pending = self._batch
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(error)
+        # The next insert starts a fresh queue and writer
+        self._batch = []
+        self._loop = None
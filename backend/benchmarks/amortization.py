@@ -0,0 +1,26 @@
+"""Timing of the closed-form amortization engine against the period-by-period loop.
+
+Run from backend/:  python -m benchmarks.amortization
+Parity with the loop is checked by tests/test_amortization.py.
+"""
+import timeit
+import numpy as np
+from amortization import amortize, schedule_records
+from loan_calculation import calculate_monthly_payment
+from tests.reference import loop_schedule
+
+
+def main():
+    loan = (350_000.0, 0.065 / 12, 360, round(calculate_monthly_payment(350_000.0, 0.065 / 12, 360), 2))
+    for name, fn in (
+        ("loop", lambda: loop_schedule(*loan)),
+        ("closed-form", lambda: amortize(*loan)),
+        ("closed-form + records", lambda: schedule_records(amortize(*loan))),
+    ):
+        runs = 500
+        seconds = min(timeit.repeat(fn, number=runs, repeat=3)) / runs
+        print(f"{name:>24}: {seconds * 1e6:9.1f} us per 360-month schedule")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Load test of /save-customer with hundreds of concurrent writers.
+
+Run from backend/:  python -m benchmarks.customer_load [writers] [rounds]
+The app runs in-process over ASGI against a throwaway SQLite store.
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+import numpy as np
+
+from benchmarks.fixtures import customer, throwaway_stores
+
+os.environ.update(throwaway_stores())
+
+import httpx
+from main import app
+from customer_info import async_store
+
+
+async def writer(client, number, rounds, latencies):
+    for round_number in range(rounds):
+        start = time.perf_counter()
+        response = await client.post("/api/v1/save-customer", json=customer(f"writer{number}-{round_number}@example.com"))
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+
+
+async def run(writers, rounds):
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(writer(client, number, rounds, latencies) for number in range(writers)))
+        elapsed = time.perf_counter() - start
+    return np.array(latencies) * 1e3, elapsed
+
+
+def main(writers=500, rounds=10):
+    logging.disable(logging.INFO)
+    latencies, elapsed = asyncio.run(run(writers, rounds))
+    print(f"{writers} concurrent writers x {rounds} saves: {len(latencies) / elapsed:,.0f} saves/s")
+    print(f"latency p50 {np.percentile(latencies, 50):.1f} ms  p99 {np.percentile(latencies, 99):.1f} ms")
+    print(f"{async_store.batches} commits, {async_store.batched_writes / max(async_store.batches, 1):.1f} saves per commit")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,53 @@
+"""Insert and lookup latency of the customer store backends.
+
+Run from backend/:  python -m benchmarks.customer_store [customers]
+The SQLite store is filled to the requested size (1M by default); the JSON store
+rewrites its whole file per insert, so it is measured at a much smaller size.
+"""
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from customer_store import JsonFileStore, SQLiteCustomerStore
+from benchmarks.fixtures import customer
+
+
+def make_record(i):
+    return customer(f"customer{i}@example.com")
+
+
+def latencies(fn, keys):
+    samples = []
+    for key in keys:
+        start = time.perf_counter()
+        fn(key)
+        samples.append(time.perf_counter() - start)
+    samples = np.array(samples) * 1e6
+    return f"p50 {np.percentile(samples, 50):9.1f} us  p99 {np.percentile(samples, 99):9.1f} us"
+
+
+def measure(name, store, size, samples):
+    rng = np.random.default_rng(3)
+    new_ids = range(size, size + samples)
+    lookups = rng.integers(0, size, samples)
+    print(f"{name} @ {size:>9,} customers")
+    print(f"  insert  {latencies(lambda i: store.insert(make_record(i)), new_ids)}")
+    print(f"  lookup  {latencies(lambda i: store.get(f'customer{i}@example.com'), lookups)}")
+
+
+def main(customers=1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_store = SQLiteCustomerStore(os.path.join(tmp, "customers.db"))
+        for chunk in range(0, customers, 100_000):
+            sqlite_store.insert_many(make_record(i) for i in range(chunk, min(chunk + 100_000, customers)))
+        measure("sqlite", sqlite_store, customers, 2_000)
+
+        json_size = min(customers, 10_000)
+        json_store = JsonFileStore(os.path.join(tmp, "customer_data.json"))
+        json_store.save_data({record["email"]: record for record in map(make_record, range(json_size))})
+        measure("json", json_store, json_size, 50)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
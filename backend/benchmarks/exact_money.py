@@ -0,0 +1,61 @@
+"""Float schedules against the int64-cent kernel behind money=exact: cents off and throughput.
+
+Run from backend/:  python -m benchmarks.exact_money [loans] [--term 360]
+Random loans are priced like the loan calculator does (annual percent / 100 / 12) and
+checked against the schedule computed with exact rational arithmetic, rounding interest
+half-even to the cent every period. Then both kernels are timed at several terms.
+"""
+import argparse
+import random
+import timeit
+import numpy as np
+from amortization import amortize
+from exact_amortization import amortize_cents, amortize_exact, to_cents, to_rate_units
+from loan_calculation import calculate_monthly_payment
+from tests.reference import ANNUAL_RATES, exact_balances
+
+TERMS = (12, 60, 360, 1200)
+
+
+def drift(loans, term_months, seed=2):
+    rng = random.Random(seed)
+    counts = {"float": [0, 0], "exact": [0, 0]}  # [rows off, loans off]
+    for _ in range(loans):
+        principal = round(rng.uniform(1_000, 1_000_000), 2)
+        annual_rate = rng.choice(ANNUAL_RATES)
+        monthly_rate = annual_rate / 100 / 12
+        payment = round(calculate_monthly_payment(principal, monthly_rate, term_months), 2)
+        expected = exact_balances(to_cents(principal), annual_rate, term_months, to_cents(payment))
+        results = {
+            "float": np.rint(amortize(principal, monthly_rate, term_months, payment).remaining_balance[:-1] * 100).astype(np.int64),
+            "exact": amortize_cents(to_cents(principal), to_rate_units(monthly_rate), term_months, to_cents(payment)).remaining_balance[:-1],
+        }
+        for name, balances in results.items():
+            off = int(np.count_nonzero(balances != expected))
+            counts[name][0] += off
+            counts[name][1] += off > 0
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.exact_money")
+    parser.add_argument("loans", nargs="?", type=int, default=300)
+    parser.add_argument("--term", type=int, default=360)
+    args = parser.parse_args(argv)
+
+    rows = args.loans * (args.term - 1)
+    for name, (rows_off, loans_off) in drift(args.loans, args.term).items():
+        print(f"{name:>5}: {rows_off:7,} of {rows:,} balances off the exact schedule, in {loans_off} of {args.loans} loans")
+
+    print(f"{'term':>6} {'float':>10} {'exact':>10}")
+    for term in TERMS:
+        monthly_rate = 0.065 / 12
+        loan = (350_000.0, monthly_rate, term, round(calculate_monthly_payment(350_000.0, monthly_rate, term), 2))
+        float_us, exact_us = (
+            min(timeit.repeat(lambda fn=fn: fn(*loan), number=200, repeat=5)) / 200 * 1e6 for fn in (amortize, amortize_exact)
+        )
+        print(f"{term:>6} {float_us:8.0f}us {exact_us:8.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Throwaway stores and customer records shared by the benchmarks that import or start the app."""
+import atexit
+import os
+import shutil
+import tempfile
+
+
+def throwaway_stores() -> dict:
+    """CUSTOMER_DB_FILE and APPLICATION_DB_FILE in a fresh directory that is removed at exit.
+
+    In-process benchmarks apply it with os.environ.update() before importing main; the
+    ones that start a server pass it in the child's environment.
+    """
+    directory = tempfile.mkdtemp(prefix="backend-bench-")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    return {
+        "CUSTOMER_DB_FILE": os.path.join(directory, "customers.db"),
+        "APPLICATION_DB_FILE": os.path.join(directory, "applications.db"),
+    }
+
+
+def customer(email: str) -> dict:
+    return {
+        "full_name": "Bench Customer",
+        "employment_status": "Employed",
+        "employee_id": "1",
+        "company_name": "Acme",
+        "email": email,
+        "phone_number": "0770000000",
+    }
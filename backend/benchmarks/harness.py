@@ -0,0 +1,103 @@
+"""Timing, result files and baseline comparison shared by the benchmark suite."""
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+
+# Repeat a micro-benchmark until one sample takes at least this long
+MIN_SAMPLE_SECONDS = 0.002
+# A case is a regression when its median is this much slower than the baseline
+REGRESSION_THRESHOLD = 0.10
+RESULT_FIELDS = ("median_us", "p95_us", "min_us", "mean_us")
+
+
+def summarize(seconds: list[float]) -> dict:
+    micros = np.asarray(seconds) * 1e6
+    return {
+        "median_us": round(float(np.median(micros)), 3),
+        "p95_us": round(float(np.percentile(micros, 95)), 3),
+        "min_us": round(float(micros.min()), 3),
+        "mean_us": round(float(micros.mean()), 3),
+        "samples": len(micros),
+    }
+
+
+def measure(fn, samples: int) -> dict:
+    """Per-call time of a synchronous function, batching fast calls into one sample."""
+    fn()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= MIN_SAMPLE_SECONDS:
+            break
+        number *= 2
+
+    seconds = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        seconds.append((time.perf_counter() - start) / number)
+    return summarize(seconds)
+
+
+async def measure_requests(send, samples: int, warmup: int = 5) -> dict:
+    """Latency of one request per sample; `send(i)` returns the response for call i."""
+    for i in range(warmup):
+        check(await send(i))
+    seconds = []
+    for i in range(warmup, warmup + samples):
+        start = time.perf_counter()
+        response = await send(i)
+        seconds.append(time.perf_counter() - start)
+        check(response)
+    return summarize(seconds)
+
+
+def check(response):
+    if response.status_code != 200:
+        raise AssertionError(f"{response.request.method} {response.request.url.path}: {response.status_code} {response.text[:200]}")
+
+
+def environment() -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "argv": sys.argv[1:],
+    }
+
+
+def write_results(path: str, results: dict):
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(baseline: dict, current: dict, threshold: float = REGRESSION_THRESHOLD, field: str = "median_us") -> list[str]:
+    """Print a baseline/current table and return the names of the regressed cases."""
+    regressions = []
+    print(f"{'case':<56} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name in sorted(baseline.keys() | current.keys()):
+        if name not in current or name not in baseline:
+            print(f"{name:<56} {'only in ' + ('baseline' if name in baseline else 'current'):>34}")
+            continue
+        before, after = baseline[name][field], current[name][field]
+        change = after / before - 1 if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<56} {before:>10.1f}us {after:>10.1f}us {change:>+8.1%}{flag}")
+    return regressions
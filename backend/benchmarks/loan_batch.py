@@ -0,0 +1,50 @@
+"""Throughput of /calculate_loan/batch against the same loans priced one call at a time.
+
+Run from backend/:  python -m benchmarks.loan_batch
+"""
+import os
+import time
+import numpy as np
+from benchmarks.fixtures import throwaway_stores
+
+os.environ.update(throwaway_stores())
+
+from fastapi.testclient import TestClient
+from main import app
+
+
+def random_loans(count, seed=11):
+    rng = np.random.default_rng(seed)
+    return {
+        "loan_amounts": np.round(rng.uniform(1_000, 500_000, count), 2).tolist(),
+        "interest_rates": np.where(rng.random(count) < 0.05, 0.0, np.round(rng.uniform(1, 25, count), 2)).tolist(),
+        "loan_term_months": rng.integers(6, 361, count).tolist(),
+    }
+
+
+def main(count=2_000):
+    client = TestClient(app)
+    loans = random_loans(count)
+
+    start = time.perf_counter()
+    singles = [
+        client.post("/api/v3/calculate_loan", json={
+            "loan_amount": amount, "interest_rate": rate, "loan_term_months": term
+        }).json()
+        for amount, rate, term in zip(loans["loan_amounts"], loans["interest_rates"], loans["loan_term_months"])
+    ]
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = client.post("/api/v3/calculate_loan/batch", json=loans).json()
+    batch_seconds = time.perf_counter() - start
+
+    payments = np.array([quote["monthly_payment"] for quote in singles])
+    assert np.allclose(payments, batch["monthly_payments"], atol=0.01)
+
+    print(f"{count} single calls: {single_seconds:8.3f} s ({count / single_seconds:10.0f} loans/s)")
+    print(f"one batch call:     {batch_seconds:8.3f} s ({count / batch_seconds:10.0f} loans/s)")
+
+
+if __name__ == "__main__":
+    main()
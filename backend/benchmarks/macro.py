@@ -0,0 +1,139 @@
+"""Macro-benchmarks: every /api/vN router driven in-process over ASGI.
+
+Imported before the app so the customer endpoints run against a throwaway SQLite store.
+"""
+import base64
+import json
+import os
+from benchmarks.fixtures import customer, throwaway_stores
+
+os.environ.update(throwaway_stores())
+
+import httpx
+import numpy as np
+from main import app
+from customer_info import store
+from loan_application import application_store
+from schedule_validation import reference_schedule
+from benchmarks.micro import loan, schedule_csv, random_loans, random_payroll
+
+SCHEDULE_TERMS = (12, 120, 360, 1200)
+BATCH_SIZE = 1_000
+APPLICANT = {"house_ownership": "Yes", "salary_deduction_approval": "Yes", "dependents": 2, "employment_duration": "5 years"}
+STORED_APPLICATIONS = 10_000
+
+
+def grow_store(size):
+    # The store only ever grows, so each size level tops it up from the previous one
+    store.insert_many(customer(f"customer{i}@example.com") for i in range(size))
+
+
+def loan_parameters(term_months):
+    principal, monthly_rate, term_months, monthly_payment = loan(term_months)
+    return {"principal": principal, "monthly_rate": monthly_rate, "term_months": term_months, "monthly_payment": monthly_payment}
+
+
+def customer_cases(client, size):
+    yield f"macro/v1/get-customer[store={size}]", lambda i: client.get(f"/api/v1/get-customer/customer{i * 7919 % size}@example.com")
+    yield f"macro/v1/save-customer[store={size}]", lambda i: client.post("/api/v1/save-customer", json=customer(f"new{size}-{i}@example.com"))
+    yield f"macro/v1/import-customers[store={size},n={BATCH_SIZE}]", lambda i: client.post("/api/v1/import-customers", content="\n".join(
+        json.dumps(customer(f"import{size}-{i}-{j}@example.com")) for j in range(BATCH_SIZE)
+    ))
+    yield f"macro/v1/export-customers[store={size}]", lambda i: client.get("/api/v1/export-customers")
+
+
+def calculation_cases(client):
+    yield "macro/v2/calculate_salary_advance", lambda i: client.post("/api/v2/calculate_salary_advance", json={
+        "gross_salary": 4_000 + i, "pay_frequency": "monthly", "requested_amount": 500
+    })
+    salaries, frequencies, requested = random_payroll(BATCH_SIZE)
+    payroll = {"gross_salary": salaries.tolist(), "pay_frequency": frequencies.tolist(), "requested_amount": requested.tolist()}
+    yield f"macro/v2/calculate_salary_advance/batch[n={BATCH_SIZE}]", lambda i: client.post("/api/v2/calculate_salary_advance/batch", json=payroll)
+
+    # The loan amount changes per call so the response cache never answers
+    yield "macro/v3/calculate_loan", lambda i: client.post("/api/v3/calculate_loan", json={
+        "loan_amount": 250_000 + i, "interest_rate": 6.5, "loan_term_months": 360
+    })
+    yield "macro/v3/calculate_loan_with_schedule[term=360]", lambda i: client.post("/api/v3/calculate_loan_with_schedule", json={
+        "loan_amount": 250_000 + i, "interest_rate": 6.5, "loan_term_months": 360
+    })
+    sweep = {"loan_amount": 250_000, "interest_rates": {"start": 1, "stop": 20.9, "step": 0.1}, "loan_term_months": {"start": 1, "stop": 360, "step": 1}}
+    yield "macro/v3/calculate_loan/sweep[200x360]", lambda i: client.post("/api/v3/calculate_loan/sweep", json=sweep)
+    amounts, rates, terms = random_loans(BATCH_SIZE)
+    loans = {"loan_amounts": amounts.tolist(), "interest_rates": (rates * 1200).tolist(), "loan_term_months": terms.tolist()}
+    yield f"macro/v3/calculate_loan/batch[n={BATCH_SIZE}]", lambda i: client.post("/api/v3/calculate_loan/batch", json=loans)
+
+
+def schedule_cases(client):
+    for term in SCHEDULE_TERMS:
+        parameters = loan_parameters(term)
+        yield f"macro/v4/generate_payment_schedule[term={term}]", lambda i, parameters=parameters: client.post(
+            "/api/v4/generate_payment_schedule", json=dict(parameters, principal=parameters["principal"] + i)
+        )
+    parameters = loan_parameters(360)
+    yield "macro/v4/generate_payment_schedule[term=360,columns]", lambda i: client.post(
+        "/api/v4/generate_payment_schedule", json=dict(parameters, principal=parameters["principal"] + i),
+        headers={"Accept": "application/vnd.schedule.columns+json"}
+    )
+    yield "macro/v4/generate_payment_schedule[term=360,exact]", lambda i: client.post(
+        "/api/v4/generate_payment_schedule", params={"money": "exact"}, json=dict(parameters, principal=parameters["principal"] + i)
+    )
+    parameters = loan_parameters(1200)
+    yield "macro/v4/generate_payment_schedule/stream[term=1200,csv]", lambda i: client.post(
+        "/api/v4/generate_payment_schedule/stream", params={"format": "csv"}, json=parameters
+    )
+
+
+def application_cases(client):
+    for term in (12, 360):
+        parameters = loan_parameters(term)
+        raw = schedule_csv(term)
+        encoded = base64.b64encode(raw).decode()
+        yield f"macro/v5/submit_loan_application[rows={term}]", lambda i, parameters=parameters, encoded=encoded: client.post(
+            "/api/v5/submit_loan_application", json=dict(APPLICANT, payment_schedule_csv=encoded, **parameters)
+        )
+        yield f"macro/v5/submit_loan_application/stream[rows={term}]", lambda i, parameters=parameters, raw=raw: client.post(
+            "/api/v5/submit_loan_application/stream", params=dict(APPLICANT, **parameters), content=raw,
+            headers={"Content-Type": "text/csv"}
+        )
+
+
+def fill_applications(count):
+    # 360-row schedules, spread over 100 customers
+    schedule = np.array(reference_schedule(*loan(360)))
+    for i in range(count):
+        application_store().insert(dict(APPLICANT, customer_email=f"customer{i % 100}@example.com", schedule_rows=360, schedule_verified=True), schedule)
+
+
+def listing_cases(client):
+    yield f"macro/v5/applications[stored={STORED_APPLICATIONS},limit=1000]", lambda i: client.get("/api/v5/applications", params={"limit": 1000})
+    yield f"macro/v5/applications[stored={STORED_APPLICATIONS},customer]", lambda i: client.get(
+        "/api/v5/applications", params={"customer_email": f"customer{i % 100}@example.com"}
+    )
+    yield f"macro/v5/applications/schedule[stored={STORED_APPLICATIONS},rows=360]", lambda i: client.get(
+        f"/api/v5/applications/{i % STORED_APPLICATIONS + 1}/schedule", headers={"Accept": "application/vnd.schedule.columns+json"}
+    )
+
+
+def client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+def cases(client, store_sizes, wanted=lambda name: True):
+    """(name, send) pairs, where send(i) returns the awaitable response of call i.
+
+    Customer cases grow the store between size levels, so they are yielded lazily and
+    the store is only filled for sizes that have a wanted case.
+    """
+    for size in store_sizes:
+        sized = list(customer_cases(client, size))
+        if any(wanted(name) for name, _ in sized):
+            grow_store(size)
+            yield from sized
+    yield from calculation_cases(client)
+    yield from schedule_cases(client)
+    yield from application_cases(client)
+    listing = list(listing_cases(client))
+    if any(wanted(name) for name, _ in listing):
+        fill_applications(STORED_APPLICATIONS)
+        yield from listing
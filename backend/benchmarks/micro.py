@@ -0,0 +1,116 @@
+"""Micro-benchmarks of the pure calculation functions behind the routers."""
+import base64
+import numpy as np
+from amortization import SCHEDULE_COLUMNS, amortize, schedule_records
+from exact_amortization import amortize_exact
+from loan_calculation import calculate_monthly_payment, calculate_monthly_payments, sweep_loans
+from advance_salary import convert_to_monthly, calculate_advances
+from csv_stream import CsvChunkReader
+from schedule_validation import ScheduleValidator, reference_schedule
+from schedule_events import Event, PREPAYMENT, IncrementalScheduler, amortize_with_events
+
+SCHEDULE_TERMS = (12, 60, 360, 1200)
+BATCH_SIZES = (100, 10_000)
+CHUNK_SIZE = 64 * 1024
+
+
+def loan(term_months, principal=350_000.0, annual_rate=6.5):
+    monthly_rate = annual_rate / 100 / 12
+    return principal, monthly_rate, term_months, round(calculate_monthly_payment(principal, monthly_rate, term_months), 2)
+
+
+def schedule_csv(term_months) -> bytes:
+    rows = np.column_stack(amortize(*loan(term_months))[:5])
+    lines = [",".join(SCHEDULE_COLUMNS)]
+    lines.extend(f"{int(row[0])},{row[1]:.2f},{row[2]:.2f},{row[3]:.2f},{row[4]:.2f}" for row in rows)
+    return ("\n".join(lines) + "\n").encode()
+
+
+def decode_csv(encoded: bytes) -> int:
+    # The base64 upload path: decode, then parse the rows incrementally
+    raw = base64.b64decode(encoded)
+    reader = CsvChunkReader()
+    rows = 0
+    for start in range(0, len(raw), CHUNK_SIZE):
+        rows += len(reader.feed(raw[start:start + CHUNK_SIZE]))
+    return rows + len(reader.close())
+
+
+def validate_csv(raw: bytes, reference) -> int:
+    validator = ScheduleValidator(reference)
+    for start in range(0, len(raw), CHUNK_SIZE):
+        validator.feed(raw[start:start + CHUNK_SIZE])
+    return validator.close()
+
+
+def event_edits(term_months, edit_period):
+    # Yearly prepayments, and a second list differing only in the one at `edit_period`
+    events = [Event(period, PREPAYMENT, 500.0) for period in range(12, term_months, 12)]
+    edited = [Event(period, PREPAYMENT, 900.0 if period == edit_period else 500.0) for period in range(12, term_months, 12)]
+    return events, edited
+
+
+def alternating_edits(args, events, edited):
+    # Each call flips between the two lists, so every call recomputes from the edited period
+    scheduler = IncrementalScheduler()
+    lists = [events, edited]
+    def edit():
+        lists.reverse()
+        return scheduler.schedule(*args, lists[0])
+    return edit
+
+
+def random_loans(count, seed=3):
+    rng = np.random.default_rng(seed)
+    return (
+        np.round(rng.uniform(1_000, 500_000, count), 2),
+        np.where(rng.random(count) < 0.05, 0.0, rng.uniform(1, 25, count) / 100 / 12),
+        rng.integers(6, 361, count),
+    )
+
+
+def random_payroll(count, seed=5):
+    rng = np.random.default_rng(seed)
+    return (
+        np.round(rng.uniform(500, 20_000, count), 2),
+        rng.choice(["monthly", "biweekly", "weekly"], count),
+        np.round(rng.uniform(50, 6_000, count), 2),
+    )
+
+
+def cases():
+    """(name, zero-argument callable) pairs; inputs are built before timing starts."""
+    for term in SCHEDULE_TERMS:
+        args = loan(term)
+        yield f"micro/amortize[term={term}]", lambda args=args: amortize(*args)
+        yield f"micro/amortize_exact[term={term}]", lambda args=args: amortize_exact(*args)
+    args = loan(1200)
+    events, _ = event_edits(1200, 600)
+    yield "micro/amortize_with_events[term=1200,events=99]", lambda: amortize_with_events(*args, events)
+    for period in (12, 600):
+        events, edited = event_edits(1200, period)
+        yield f"micro/incremental_edit[term=1200,period={period}]", alternating_edits(args, events, edited)
+    schedule = amortize(*loan(360))
+    yield "micro/schedule_records[term=360]", lambda: schedule_records(schedule)
+
+    yield "micro/calculate_monthly_payment", lambda: calculate_monthly_payment(350_000.0, 0.065 / 12, 360)
+    for size in BATCH_SIZES:
+        loans = random_loans(size)
+        yield f"micro/calculate_monthly_payments[n={size}]", lambda loans=loans: calculate_monthly_payments(*loans)
+
+    rates, terms = np.round(np.arange(200) * 0.1 + 1, 10), np.arange(1, 361)
+    yield "micro/sweep_loans[200x360]", lambda: sweep_loans(250_000.0, rates, terms)
+    extras = np.array([0.0, 100.0, 500.0])
+    yield "micro/sweep_loans[200x360,extra=3]", lambda: sweep_loans(250_000.0, rates, terms, extras)
+
+    yield "micro/convert_to_monthly", lambda: convert_to_monthly(1_250.0, "Biweekly")
+    for size in BATCH_SIZES:
+        payroll = random_payroll(size)
+        yield f"micro/calculate_advances[n={size}]", lambda payroll=payroll: calculate_advances(*payroll)
+
+    for term in (360, 1200):
+        raw = schedule_csv(term)
+        encoded = base64.b64encode(raw)
+        reference = reference_schedule(*loan(term))
+        yield f"micro/csv_decode[rows={term}]", lambda encoded=encoded: decode_csv(encoded)
+        yield f"micro/schedule_validate[rows={term}]", lambda raw=raw, reference=reference: validate_csv(raw, reference)
@@ -0,0 +1,56 @@
+"""Batch salary advance scoring of a large payroll CSV.
+
+Run from backend/:  python -m benchmarks.payroll [rows]
+The payroll is fed to the streaming scorer in 64 KB chunks, as the endpoint receives
+it, and peak traced memory shows the batch size bounds the working set.
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+import numpy as np
+from advance_salary import read_payroll_header, score_payroll
+
+CHUNK_SIZE = 64 * 1024
+
+
+def build_payroll(rows, seed=5):
+    rng = np.random.default_rng(seed)
+    salaries = np.round(rng.uniform(500, 20_000, rows), 2)
+    requested = np.round(rng.uniform(50, 6_000, rows), 2)
+    frequencies = rng.choice(["monthly", "biweekly", "weekly"], rows)
+    lines = ["employee_id,gross_salary,pay_frequency,requested_amount"]
+    lines.extend(f"E{i},{s},{f},{r}" for i, (s, f, r) in enumerate(zip(salaries.tolist(), frequencies.tolist(), requested.tolist())))
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def score(payroll):
+    async def chunks():
+        for start in range(0, len(payroll), CHUNK_SIZE):
+            yield payroll[start:start + CHUNK_SIZE]
+
+    body = chunks()
+    reader, rows = await read_payroll_header(body)
+    output = 0
+    async for block in score_payroll(reader, rows, body, asyncio.Event()):
+        output += len(block)
+    return output
+
+
+def main(rows=1_000_000):
+    payroll = build_payroll(rows)
+    start = time.perf_counter()
+    output = asyncio.run(score(payroll))
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    asyncio.run(score(payroll))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(f"payroll: {rows:,} rows, {len(payroll) / 1e6:.1f} MB in, {output / 1e6:.1f} MB out")
+    print(f"scored in {seconds:.2f} s ({rows / seconds:,.0f} rows/s), peak traced memory {peak / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,67 @@
+"""Payload size and end-to-end latency of the payment schedule wire formats.
+
+Run from backend/:  python -m benchmarks.schedule_formats
+Each request uses a fresh principal so the response cache never answers it, and the
+timing includes building the client-side DataFrame.
+"""
+import itertools
+import os
+import time
+import numpy as np
+import pandas as pd
+from benchmarks.fixtures import throwaway_stores
+
+os.environ.update(throwaway_stores())
+
+from fastapi.testclient import TestClient
+from main import app
+from amortization import SCHEDULE_COLUMNS
+from loan_calculation import calculate_monthly_payment
+from payment_schedule import COLUMNS_MEDIA_TYPE, FLOAT64_MEDIA_TYPE
+
+
+def records_frame(response):
+    return pd.DataFrame(response.json()["schedule"])
+
+
+def columns_frame(response):
+    return pd.DataFrame(response.json()["columns"])
+
+
+def float64_frame(response):
+    rows = int(response.headers["X-Schedule-Rows"])
+    columns = np.frombuffer(response.content, dtype="<f8").reshape(len(SCHEDULE_COLUMNS), rows)
+    return pd.DataFrame(dict(zip(SCHEDULE_COLUMNS, columns)))
+
+
+FORMATS = (
+    ("records json", "application/json", records_frame),
+    ("columns json", COLUMNS_MEDIA_TYPE, columns_frame),
+    ("float64", FLOAT64_MEDIA_TYPE, float64_frame),
+)
+
+
+def main(requests=200):
+    client = TestClient(app)
+    principals = itertools.count(100_000)
+    for term_months in (60, 360, 1200):
+        print(f"{term_months}-month schedule")
+        for name, accept, to_frame in FORMATS:
+            samples = []
+            for _ in range(requests):
+                principal = float(next(principals))
+                body = {
+                    "principal": principal,
+                    "monthly_rate": 0.06 / 12,
+                    "term_months": term_months,
+                    "monthly_payment": round(calculate_monthly_payment(principal, 0.06 / 12, term_months), 2),
+                }
+                start = time.perf_counter()
+                response = client.post("/api/v4/generate_payment_schedule", json=body, headers={"Accept": accept})
+                to_frame(response)
+                samples.append(time.perf_counter() - start)
+            print(f"  {name:>13}: {len(response.content):9,} bytes  p50 {np.median(samples) * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
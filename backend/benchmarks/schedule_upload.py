@@ -0,0 +1,61 @@
+"""Peak memory of the base64 upload path against streaming validation.
+
+Run from backend/:  python -m benchmarks.schedule_upload [rows]
+The input bytes are built before tracing starts, so only per-request work is counted.
+"""
+import base64
+import io
+import sys
+import time
+import tracemalloc
+import pandas as pd
+from amortization import SCHEDULE_COLUMNS
+from schedule_validation import ScheduleValidator
+
+CHUNK_SIZE = 64 * 1024
+
+
+def build_csv(rows):
+    lines = [",".join(SCHEDULE_COLUMNS)]
+    balance = rows * 100.0
+    for period in range(1, rows + 1):
+        balance -= 90.0
+        lines.append(f"{period},100.0,90.0,10.0,{balance:.2f}")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def base64_path(encoded):
+    csv_bytes = base64.b64decode(encoded)
+    return pd.read_csv(io.StringIO(csv_bytes.decode("utf-8"))).head()
+
+
+def streaming_path(raw):
+    validator = ScheduleValidator()
+    for start in range(0, len(raw), CHUNK_SIZE):
+        validator.feed(raw[start:start + CHUNK_SIZE])
+    return validator.close()
+
+
+def traced(fn, payload):
+    # Timed untraced first, since tracemalloc slows allocation-heavy code down
+    start = time.perf_counter()
+    fn(payload)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn(payload)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main(rows=500_000):
+    raw = build_csv(rows)
+    encoded = base64.b64encode(raw).decode()
+    print(f"schedule: {rows:,} rows, {len(raw) / 1e6:.1f} MB CSV, {len(encoded) / 1e6:.1f} MB base64")
+    for name, fn, payload in (("base64 + read_csv", base64_path, encoded), ("streaming", streaming_path, raw)):
+        seconds, peak = traced(fn, payload)
+        print(f"{name:>18}: peak {peak / 1e6:8.2f} MB  {seconds:6.2f} s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,74 @@
+"""Cold-start cost of one backend worker: time to import main.app and resident memory after it.
+
+Run from backend/:  python -m benchmarks.startup [--runs 10] [--output startup.json] [--max-import-ms N] [--max-rss-mb N]
+Every run is a fresh interpreter, as a new uvicorn worker would be. With a budget the
+script exits with status 1 when the median exceeds it, or when a module that should
+never load at startup is imported, so it can gate CI. `--output` writes the same JSON
+as benchmarks.suite, so `suite compare` works on it.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+from benchmarks.fixtures import throwaway_stores
+from benchmarks.harness import summarize, write_results
+
+# Heavy libraries the request path does not need; importing any of them is a regression
+FORBIDDEN_MODULES = ("pandas", "matplotlib", "scipy", "httpx", "streamlit")
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import main
+seconds = time.perf_counter() - start
+print(json.dumps({
+    "seconds": seconds,
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "forbidden": sorted({name.split(".")[0] for name in sys.modules} & set(%r)),
+}))
+""" % (FORBIDDEN_MODULES,)
+
+
+def probe() -> dict:
+    # Throwaway stores keep the probe from creating or migrating the real databases
+    env = dict(os.environ, **throwaway_stores())
+    output = subprocess.run([sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output")
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-rss-mb", type=float)
+    args = parser.parse_args(argv)
+
+    probe()  # warm the bytecode and filesystem caches
+    runs = [probe() for _ in range(args.runs)]
+    stats = summarize([run["seconds"] for run in runs])
+    rss_mb = float(np.median([run["rss_kb"] for run in runs])) / 1024
+    forbidden = runs[-1]["forbidden"]
+    print(f"import main: median {stats['median_us'] / 1e3:.0f} ms, p95 {stats['p95_us'] / 1e3:.0f} ms over {args.runs} runs")
+    print(f"peak RSS {rss_mb:.1f} MB, {runs[-1]['modules']} modules loaded")
+
+    if args.output:
+        write_results(args.output, {"startup/import_main": dict(stats, rss_mb=round(rss_mb, 1))})
+
+    failures = []
+    if forbidden:
+        failures.append(f"heavy modules imported at startup: {', '.join(forbidden)}")
+    if args.max_import_ms is not None and stats["median_us"] / 1e3 > args.max_import_ms:
+        failures.append(f"import time over the {args.max_import_ms:g} ms budget")
+    if args.max_rss_mb is not None and rss_mb > args.max_rss_mb:
+        failures.append(f"RSS over the {args.max_rss_mb:g} MB budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
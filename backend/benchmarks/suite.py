@@ -0,0 +1,92 @@
+"""Micro and macro benchmark suite with JSON results and baseline comparison.
+
+Run from backend/:
+    python -m benchmarks.suite run [--output results.json] [--only PATTERN] [--quick]
+    python -m benchmarks.suite compare baseline.json results.json [--threshold 0.10]
+
+`compare` exits with status 1 when any case is slower than the baseline by more than
+the threshold, so it can gate CI. Baselines are only comparable on the same machine.
+"""
+import argparse
+import asyncio
+import fnmatch
+import logging
+import sys
+from benchmarks.harness import REGRESSION_THRESHOLD, RESULT_FIELDS, compare, load_results, measure, measure_requests, write_results
+
+MICRO_SAMPLES = 30
+MACRO_SAMPLES = 200
+QUICK_SAMPLES = 10
+# Customer store sizes the v1 cases run at
+STORE_SIZES = (1_000, 100_000)
+
+
+def selected(name, patterns):
+    return not patterns or any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def report(name, stats):
+    print(f"{name:<56} {stats['median_us']:>12.1f}us  p95 {stats['p95_us']:>12.1f}us", flush=True)
+
+
+def run_micro(patterns, samples) -> dict:
+    from benchmarks import micro
+    results = {}
+    for name, fn in micro.cases():
+        if selected(name, patterns):
+            results[name] = measure(fn, samples)
+            report(name, results[name])
+    return results
+
+
+async def run_macro(patterns, samples, store_sizes) -> dict:
+    from benchmarks import macro
+    results = {}
+    async with macro.client() as client:
+        for name, send in macro.cases(client, store_sizes, lambda name: selected(name, patterns)):
+            if selected(name, patterns):
+                results[name] = await measure_requests(send, samples)
+                report(name, results[name])
+    return results
+
+
+def run(args):
+    # The app is only imported here, so compare stays cheap and quiet
+    logging.disable(logging.INFO)
+    patterns = args.only or []
+    if args.quick:
+        micro_samples, macro_samples, store_sizes = QUICK_SAMPLES, QUICK_SAMPLES, STORE_SIZES[:1]
+    else:
+        micro_samples, macro_samples, store_sizes = MICRO_SAMPLES, MACRO_SAMPLES, STORE_SIZES
+    results = run_micro(patterns, micro_samples)
+    results.update(asyncio.run(run_macro(patterns, macro_samples, store_sizes)))
+    write_results(args.output, results)
+    print(f"{len(results)} cases written to {args.output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("--output", default="benchmark-results.json")
+    run_parser.add_argument("--only", action="append", metavar="PATTERN", help="glob on case names, e.g. 'micro/*' or '*/v4/*'; repeatable")
+    run_parser.add_argument("--quick", action="store_true", help="fewer samples and only the smallest store, for a smoke run")
+
+    compare_parser = commands.add_parser("compare", help="compare results against a saved baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="allowed slowdown as a fraction (default 0.10)")
+    compare_parser.add_argument("--field", choices=RESULT_FIELDS, default="median_us")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run(args)
+        return 0
+    regressions = compare(load_results(args.baseline), load_results(args.current), args.threshold, args.field)
+    print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
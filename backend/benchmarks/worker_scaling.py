@@ -0,0 +1,135 @@
+"""Throughput of the mixed calculator + customer workload against the uvicorn worker count.
+
+Run from backend/:  python -m benchmarks.worker_scaling [workers ...] [--seconds 10] [--clients 4] [--concurrency 32]
+Each worker count gets a fresh uvicorn server on a local port and a throwaway SQLite
+store. Load comes from separate client processes over real TCP connections, so the
+client is not the bottleneck. Numbers only scale while there are idle CPU cores.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import httpx
+import numpy as np
+from benchmarks.fixtures import customer, throwaway_stores
+
+# Share of each request kind in the mix
+WORKLOAD = (
+    ("calculate_loan", 0.30),
+    ("calculate_salary_advance", 0.20),
+    ("generate_payment_schedule", 0.20),
+    ("get_customer", 0.20),
+    ("save_customer", 0.10),
+)
+SEED_CUSTOMERS = 1_000
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, **throwaway_stores(), WEB_CONCURRENCY=str(workers), HOT_PATH_LOG_RATE="0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError(f"uvicorn with {workers} workers did not start")
+
+
+def request(kind, rng, client_id, counter):
+    # Varying amounts keep the per-worker response cache from answering everything
+    if kind == "calculate_loan":
+        return "POST", "/api/v3/calculate_loan", {"loan_amount": rng.randint(1_000, 500_000), "interest_rate": 6.5, "loan_term_months": 360}
+    if kind == "calculate_salary_advance":
+        return "POST", "/api/v2/calculate_salary_advance", {"gross_salary": rng.randint(500, 20_000), "pay_frequency": "monthly", "requested_amount": 500}
+    if kind == "generate_payment_schedule":
+        return "POST", "/api/v4/generate_payment_schedule", {
+            "principal": rng.randint(10_000, 500_000), "monthly_rate": 0.065 / 12, "term_months": 360, "monthly_payment": 3_200.0
+        }
+    if kind == "get_customer":
+        return "GET", f"/api/v1/get-customer/customer{rng.randrange(SEED_CUSTOMERS)}@example.com", None
+    return "POST", "/api/v1/save-customer", customer(f"client{client_id}-{counter}-{rng.random()}@example.com")
+
+
+async def drive(port, client_id, seconds, concurrency):
+    rng = random.Random(client_id)
+    kinds, weights = zip(*WORKLOAD)
+    latencies = []
+    deadline = time.monotonic() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        async def user(number):
+            counter = 0
+            while time.monotonic() < deadline:
+                method, path, body = request(rng.choices(kinds, weights)[0], rng, f"{client_id}.{number}", counter)
+                counter += 1
+                start = time.perf_counter()
+                response = await client.request(method, path, json=body)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, f"{path}: {response.status_code} {response.text[:200]}"
+
+        await asyncio.gather(*(user(number) for number in range(concurrency)))
+    return latencies
+
+
+def client_process(args):
+    return asyncio.run(drive(*args))
+
+
+def seed(port):
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+        for i in range(SEED_CUSTOMERS):
+            client.post("/api/v1/save-customer", json=customer(f"customer{i}@example.com"))
+
+
+def measure(workers, seconds, clients, concurrency):
+    port = free_port()
+    server = start_server(workers, port)
+    try:
+        seed(port)
+        with multiprocessing.Pool(clients) as pool:
+            start = time.perf_counter()
+            results = pool.map(client_process, [(port, client, seconds, concurrency) for client in range(clients)])
+            elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+    latencies = np.concatenate([np.asarray(result) for result in results]) * 1e3
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.worker_scaling")
+    parser.add_argument("workers", nargs="*", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=4, help="client processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent requests per client process")
+    args = parser.parse_args(argv)
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients x {args.concurrency} concurrent requests, {args.seconds:g} s per run")
+    baseline = None
+    for workers in args.workers:
+        throughput, p50, p99 = measure(workers, args.seconds, args.clients, args.concurrency)
+        baseline = baseline or throughput
+        print(f"{workers:>3} workers: {throughput:9,.0f} req/s ({throughput / baseline:4.2f}x)  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
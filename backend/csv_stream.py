@@ -0,0 +1,47 @@
+import codecs
+import csv
+
+MAX_LINE_BYTES = 64 * 1024
+
+
+class CsvChunkReader:
+    """Turns arbitrary body chunks into parsed CSV rows without buffering the body.
+
+    Only the trailing partial line of each chunk is carried over to the next one. A line
+    that is too long or not UTF-8 is raised from the next feed() or close(), so the
+    complete rows in front of it in the same chunk are still returned first.
+    """
+
+    def __init__(self):
+        self.header = None
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._pending = ""
+        self._error = None
+
+    def feed(self, chunk: bytes) -> list[list[str]]:
+        if self._error is not None:
+            raise self._error
+        try:
+            text = self._decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            # Keep what decoded before the bad bytes; the line they are in is dropped below
+            self._error = e
+            text = e.object[:e.start].decode("utf-8")
+        lines = (self._pending + text).split("\n")
+        self._pending = lines.pop()
+        if self._error is None and len(self._pending) > MAX_LINE_BYTES:
+            self._error = ValueError("CSV line is too long.")
+        return self._parse(lines)
+
+    def close(self) -> list[list[str]]:
+        if self._error is not None:
+            raise self._error
+        lines = [self._pending + self._decoder.decode(b"", final=True)]
+        self._pending = ""
+        return self._parse(lines)
+
+    def _parse(self, lines: list[str]) -> list[list[str]]:
+        rows = csv.reader(line.rstrip("\r") for line in lines if line.strip())
+        if self.header is None:
+            self.header = next(rows, None)
+        return list(rows)
@@ -0,0 +1,54 @@
+import os
+from customer_store import CustomerStore
+from lru import LRUCache
+
+CACHE_SIZE = int(os.environ.get("CUSTOMER_CACHE_SIZE", "10000"))
+
+
+class CachedCustomerStore(CustomerStore):
+    """Read-through cache in front of another store.
+
+    The cache is dropped whenever the backing files' mtime or size changes, which
+    covers writes from other workers, and after every local insert.
+    """
+
+    def __init__(self, store: CustomerStore, max_size: int = CACHE_SIZE):
+        self.store = store
+        self.cache = LRUCache(max_size)
+        self._signature = None
+
+    def _revalidate(self):
+        signature = self.store.signature()
+        if signature != self._signature:
+            self.cache.clear()
+            self._signature = signature
+
+    def get(self, email: str) -> dict | None:
+        self._revalidate()
+        record = self.cache.get(email)
+        if record is None:
+            record = self.store.get(email)
+            if record is not None:
+                self.cache.put(email, record)
+        return record
+
+    def insert(self, record: dict) -> bool:
+        inserted = self.store.insert(record)
+        self._signature = None
+        return inserted
+
+    def insert_many_results(self, records: list[dict]) -> list[bool]:
+        results = self.store.insert_many_results(records)
+        self._signature = None
+        return results
+
+    def signature(self) -> tuple:
+        return self.store.signature()
+
+    def iter_json(self, batch_size: int = 1000):
+        # Exports read the backend directly so they do not flush the cache
+        return self.store.iter_json(batch_size)
+
+    def __getattr__(self, name):
+        # Backend-specific helpers (insert_many, count, ...) pass straight through
+        return getattr(self.store, name)
@@ -1,55 +1,131 @@
-import json
-import os
 import logging
-from fastapi import APIRouter, HTTPException
-from filelock import FileLock
-from models import CustomerInfo, CustomerResponse
+import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from models import CustomerInfo, CustomerResponse, CacheStatsResponse, CustomerImportError, CustomerImportResponse
+from customer_store import create_store
+from customer_cache import CachedCustomerStore
+from async_customer_store import AsyncCustomerStore
+from metrics import should_log
+from csv_stream import MAX_LINE_BYTES
 
 router = APIRouter()
-DATA_FILE = "data/customer_data.json"
-LOCK_FILE = DATA_FILE + ".lock"
+
+# Records committed per transaction by the bulk import, and per page of the export
+IMPORT_BATCH = int(os.environ.get("CUSTOMER_IMPORT_BATCH", "1000"))
+EXPORT_BATCH = int(os.environ.get("CUSTOMER_EXPORT_BATCH", "1000"))
+MAX_IMPORT_ERRORS = 100
 
 # Set up logging to prevent issues with file access
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def load_customer_data():
-    try:
-        if not os.path.exists(DATA_FILE):
-            return {}
-        with FileLock(LOCK_FILE):
-            with open(DATA_FILE, "r") as f:
-                return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading customer data: {e}")
-        return {}
+# Backend is chosen with CUSTOMER_STORE (sqlite by default, json for the legacy file)
+store = CachedCustomerStore(create_store())
+# Request handlers go through the async front so they never hold a threadpool slot during I/O
+async_store = AsyncCustomerStore(store)
 
-def save_customer_data(data):
+@router.post("/save-customer", response_model=CustomerResponse)
+async def save_customer(customer: CustomerInfo):
     try:
-        os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
-        with FileLock(LOCK_FILE):
-            with open(DATA_FILE, "w") as f:
-                json.dump(data, f, indent=4)
+        inserted = await async_store.insert(customer.model_dump())
     except Exception as e:
         logger.error(f"Error saving customer data: {e}")
         raise HTTPException(status_code=500, detail="Failed to save customer data.")
-
-@router.post("/save-customer", response_model=CustomerResponse)
-def save_customer(customer: CustomerInfo):
-    data = load_customer_data()
-    if customer.email in data:
+    if not inserted:
         logger.warning(f"Attempt to overwrite existing customer: {customer.email}")
         raise HTTPException(status_code=400, detail="Customer with this email already exists.")
-    data[customer.email] = customer.model_dump()
-    save_customer_data(data)
-    logger.info(f"Customer saved: {customer.email}")
+    if should_log():
+        logger.info("Customer saved email=%s", customer.email)
     return CustomerResponse(message="Customer information saved successfully.")
 
 @router.get("/get-customer/{email}", response_model=CustomerInfo)
-def get_customer(email: str):
-    data = load_customer_data()
-    if email not in data:
+async def get_customer(email: str):
+    record = await async_store.get(email)
+    if record is None:
         logger.warning(f"Customer not found: {email}")
         raise HTTPException(status_code=404, detail="Customer not found.")
-    logger.info(f"Customer retrieved: {email}")
-    return CustomerInfo(**data[email])
+    if should_log():
+        logger.info("Customer retrieved email=%s", email)
+    return CustomerInfo(**record)
+
+async def ndjson_lines(chunks):
+    # (line number, raw line) pairs; only the trailing partial line of a chunk is carried over
+    pending = b""
+    number = 0
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        if len(pending) > MAX_LINE_BYTES:
+            raise HTTPException(status_code=400, detail=f"Line {number + len(lines) + 1} is too long.")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+    if pending.strip():
+        yield number + 1, pending
+
+def import_error(line: int, error: ValidationError) -> CustomerImportError:
+    detail = "; ".join(f"{'.'.join(map(str, e['loc'])) or 'record'}: {e['msg']}" for e in error.errors(include_url=False))
+    return CustomerImportError(line=line, detail=detail)
+
+@router.post("/import-customers", response_model=CustomerImportResponse)
+async def import_customers(request: Request):
+    """Bulk load from an NDJSON body, one CustomerInfo per line.
+
+    Lines are validated as they stream in and committed IMPORT_BATCH at a time, one
+    write per batch. Emails that already exist, in the store or earlier in the file,
+    are counted as duplicates by the store's unique index; invalid lines are skipped.
+    """
+    imported = duplicates = invalid = 0
+    errors = []
+    batch, batch_lines = [], []
+
+    async def commit():
+        nonlocal imported, duplicates
+        try:
+            results = await async_store.insert_many(batch)
+        except Exception as e:
+            logger.error(f"Error importing customer batch: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to save customer data after {imported} imported records.")
+        for line, inserted in zip(batch_lines, results):
+            if inserted:
+                imported += 1
+            else:
+                duplicates += 1
+                if len(errors) < MAX_IMPORT_ERRORS:
+                    errors.append(CustomerImportError(line=line, detail="Customer with this email already exists."))
+        batch.clear()
+        batch_lines.clear()
+
+    async for line, raw in ndjson_lines(request.stream()):
+        try:
+            customer = CustomerInfo.model_validate_json(raw)
+        except ValidationError as e:
+            invalid += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append(import_error(line, e))
+            continue
+        batch.append(customer.model_dump())
+        batch_lines.append(line)
+        if len(batch) >= IMPORT_BATCH:
+            await commit()
+    if batch:
+        await commit()
+
+    logger.info(f"Customer import: imported={imported} duplicates={duplicates} invalid={invalid}")
+    return CustomerImportResponse(imported=imported, duplicates=duplicates, invalid=invalid, errors=errors)
+
+def ndjson_customers():
+    for records in store.iter_json(EXPORT_BATCH):
+        yield "".join(record + "\n" for record in records)
+
+@router.get("/export-customers")
+def export_customers():
+    # Pages are read from the store while the response is being sent
+    return StreamingResponse(ndjson_customers(), media_type="application/x-ndjson")
+
+@router.get("/customer-cache/stats", response_model=CacheStatsResponse)
+def get_customer_cache_stats():
+    return CacheStatsResponse(**store.cache.stats())
@@ -0,0 +1,241 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import logging
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator
+from filelock import FileLock
+from metrics import LOCK_WAIT
+
+DATA_FILE = "data/customer_data.json"
+LOCK_FILE = DATA_FILE + ".lock"
+DB_FILE = os.environ.get("CUSTOMER_DB_FILE", "data/customer_data.db")
+STORE_BACKEND = os.environ.get("CUSTOMER_STORE", "sqlite")
+
+logger = logging.getLogger(__name__)
+
+
+class CustomerStore(ABC):
+    """Email-keyed customer records. Backends implement every abstract method."""
+
+    @abstractmethod
+    def get(self, email: str) -> dict | None:
+        ...
+
+    @abstractmethod
+    def insert(self, record: dict) -> bool:
+        """Add a record keyed on its email; returns False if the email already exists."""
+
+    def insert_many_results(self, records: list[dict]) -> list[bool]:
+        """Insert several records in one commit; one insert() result per record."""
+        return [self.insert(record) for record in records]
+
+    @abstractmethod
+    def signature(self) -> tuple:
+        """Cheap fingerprint of the backing files that changes whenever any process writes."""
+
+    @abstractmethod
+    def iter_json(self, batch_size: int = 1000) -> Iterator[list[str]]:
+        """Every record serialized as JSON, in lists of up to batch_size."""
+
+
+def file_signature(*paths: str) -> tuple:
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+@contextmanager
+def timed_lock(lock_file: str, operation: str):
+    # Records how long callers queue on the cross-process lock before getting it
+    start = time.perf_counter()
+    with FileLock(lock_file):
+        LOCK_WAIT.observe(time.perf_counter() - start, operation)
+        yield
+
+
+class JsonFileStore(CustomerStore):
+    """The original single JSON document, rewritten in full on every insert.
+
+    Writers hold the FileLock across the whole read-modify-write and replace the file
+    atomically, so readers in any process always see a complete document without locking.
+    """
+
+    def __init__(self, data_file: str = DATA_FILE):
+        self.data_file = data_file
+        self.lock_file = data_file + ".lock"
+
+    def load_data(self) -> dict:
+        try:
+            if not os.path.exists(self.data_file):
+                return {}
+            with open(self.data_file, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading customer data: {e}")
+            return {}
+
+    def save_data(self, data: dict):
+        # Caller holds the lock; the rename swaps the whole file in for readers at once
+        directory = os.path.dirname(self.data_file) or "."
+        fd, temp_file = tempfile.mkstemp(dir=directory, prefix=".customer_data.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=4)
+            os.chmod(temp_file, 0o644)
+            os.replace(temp_file, self.data_file)
+        except BaseException:
+            os.unlink(temp_file)
+            raise
+
+    def get(self, email: str) -> dict | None:
+        return self.load_data().get(email)
+
+    def insert(self, record: dict) -> bool:
+        return self.insert_many_results([record])[0]
+
+    def insert_many_results(self, records: list[dict]) -> list[bool]:
+        # One read and one rewrite of the file for the whole batch
+        os.makedirs(os.path.dirname(self.data_file) or ".", exist_ok=True)
+        with timed_lock(self.lock_file, "write"):
+            data = self.load_data()
+            results = []
+            for record in records:
+                results.append(record["email"] not in data)
+                data.setdefault(record["email"], record)
+            if any(results):
+                self.save_data(data)
+        return results
+
+    def signature(self) -> tuple:
+        return file_signature(self.data_file)
+
+    def iter_json(self, batch_size: int = 1000) -> Iterator[list[str]]:
+        # The document can only be parsed whole; batching just bounds the serialized text
+        records = list(self.load_data().values())
+        for start in range(0, len(records), batch_size):
+            yield [json.dumps(record) for record in records[start:start + batch_size]]
+
+
+class SQLiteCustomerStore(CustomerStore):
+    """SQLite in WAL mode with the email as primary key.
+
+    Inserts touch one B-tree page instead of rewriting every customer, and readers
+    never block the writer, including readers in other worker processes. Writes take
+    the database write lock up front (BEGIN IMMEDIATE) so concurrent writers queue on
+    the busy timeout instead of failing. Each thread keeps its own connection.
+    """
+
+    def __init__(self, db_file: str = DB_FILE):
+        self.db_file = db_file
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+        self.connection().execute(
+            "CREATE TABLE IF NOT EXISTS customers (email TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID"
+        )
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, email: str) -> dict | None:
+        row = self.connection().execute("SELECT data FROM customers WHERE email = ?", (email,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def insert(self, record: dict) -> bool:
+        try:
+            self.connection().execute(
+                "INSERT INTO customers (email, data) VALUES (?, ?)", (record["email"], json.dumps(record))
+            )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def insert_many(self, records) -> int:
+        """Insert records in one transaction, skipping emails that already exist."""
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.executemany(
+                "INSERT OR IGNORE INTO customers (email, data) VALUES (?, ?)",
+                ((record["email"], json.dumps(record)) for record in records),
+            )
+        return cursor.rowcount
+
+    def insert_many_results(self, records: list[dict]) -> list[bool]:
+        # A failed INSERT only rolls back its own statement, so the batch still commits once
+        conn = self.connection()
+        results = []
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for record in records:
+                try:
+                    conn.execute("INSERT INTO customers (email, data) VALUES (?, ?)", (record["email"], json.dumps(record)))
+                    results.append(True)
+                except sqlite3.IntegrityError:
+                    results.append(False)
+        return results
+
+    def signature(self) -> tuple:
+        # Commits land in the -wal file until a checkpoint folds them into the database
+        return file_signature(self.db_file, self.db_file + "-wal")
+
+    def count(self) -> int:
+        return self.connection().execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+    def iter_json(self, batch_size: int = 1000) -> Iterator[list[str]]:
+        # Keyset pages on the primary key: each page is a short read, so no snapshot is held
+        # open for the whole export, and the stored JSON text is passed on without parsing.
+        # A streaming response resumes the generator on whichever threadpool thread is free,
+        # so each page is read through that thread's own connection
+        last_email = ""
+        while True:
+            rows = self.connection().execute(
+                "SELECT email, data FROM customers WHERE email > ? ORDER BY email LIMIT ?", (last_email, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            last_email = rows[-1][0]
+            yield [data for _, data in rows]
+
+
+def migrate_json_to_sqlite(json_file: str = DATA_FILE, db_file: str = DB_FILE) -> int:
+    """One-shot import of the legacy JSON document; returns the number of customers added."""
+    records = JsonFileStore(json_file).load_data().values()
+    added = SQLiteCustomerStore(db_file).insert_many(records)
+    logger.info(f"Migrated {added} customers from {json_file} to {db_file}")
+    return added
+
+
+def create_store(backend: str = STORE_BACKEND) -> CustomerStore:
+    if backend == "json":
+        return JsonFileStore()
+    if backend == "sqlite":
+        # Workers start together; only the first one creates the database and imports the JSON file
+        os.makedirs(os.path.dirname(DB_FILE) or ".", exist_ok=True)
+        with FileLock(DB_FILE + ".lock"):
+            is_new = not os.path.exists(DB_FILE)
+            store = SQLiteCustomerStore()
+            if is_new and os.path.exists(DATA_FILE):
+                migrate_json_to_sqlite()
+        return store
+    raise ValueError(f"Unknown customer store backend: {backend}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate_json_to_sqlite()
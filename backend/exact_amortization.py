@@ -0,0 +1,137 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+import numpy as np
+from amortization import AmortizationSchedule, MAX_PASSES, MIN_BLOCK, _predict
+
+# Monthly rates are counted in 1/1,200,000,000ths: exact for any annual rate with up to
+# 8 decimals divided by 12 (6.5% a year -> 6_500_000), and any monthly rate with up to 8
+RATE_SCALE = 12 * 10 ** 8
+INT64_MAX = np.iinfo(np.int64).max
+
+
+def to_cents(amount: float) -> int:
+    # The decimal the client wrote, not the binary float it was parsed into
+    return int((Decimal(repr(amount)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+
+def to_rate_units(monthly_rate: float) -> int:
+    return int((Decimal(repr(monthly_rate)) * RATE_SCALE).quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+
+def _divide_half_even(numerator: np.ndarray, denominator: int) -> np.ndarray:
+    # Integer division rounding ties to the even quotient (banker's rounding): round up when
+    # the remainder is over half, or exactly half and the quotient odd
+    quotient, remainder = np.divmod(numerator, denominator)
+    return quotient + (2 * remainder + (quotient & 1) > denominator)
+
+
+def _interest(balances: np.ndarray, rate_units: int) -> np.ndarray:
+    return _divide_half_even(balances * rate_units, RATE_SCALE)
+
+
+def _block_cents(balances: np.ndarray, rate_units: int, payment: int):
+    # Same predict-and-verify scheme as amortization._block_balances, but the check is
+    # the exact integer recurrence, so a float prediction only ever saves work
+    count = len(balances)
+    rate = rate_units / RATE_SCALE
+    residuals = np.zeros(count - 1)
+    start = 0
+
+    for _ in range(MAX_PASSES):
+        if start >= count - 1:
+            return
+        guess = _predict(float(balances[start]), rate, float(payment), residuals[start:])
+        if not np.isfinite(guess).all() or np.abs(guess).max() >= 2 ** 53:
+            break
+        balances[start + 1:] = np.rint(guess[1:])
+
+        current = balances[start:-1]
+        interest = _interest(current, rate_units)
+        following = current - payment + interest
+        mismatch = np.flatnonzero(following != balances[start + 1:])
+        if mismatch.size == 0:
+            return
+
+        residuals[start:] = interest - current * rate
+        first = start + int(mismatch[0])
+        balances[first + 1] = following[mismatch[0]]
+        start = first + 1
+
+    for i in range(start, count - 1):
+        balances[i + 1] = balances[i] - payment + _interest(balances[i:i + 1], rate_units)[0]
+
+
+def check_cents_range(principal: int, rate_units: int, term_months: int, payment: int):
+    if rate_units < 0:
+        raise ValueError("Exact money mode needs a monthly rate of zero or more.")
+    # principal x rate has to fit in int64, and so does the sum of every payment
+    largest = INT64_MAX // max(rate_units, term_months, 1)
+    if max(abs(principal), abs(payment)) > largest:
+        raise ValueError(f"Exact money mode handles principal and payment up to {largest // 100:,}.")
+
+
+def opening_cents(principal: int, rate_units: int, term_months: int, payment: int) -> np.ndarray:
+    """Opening balance of each period in int64 cents, exactly as the cent recurrence gives it."""
+    balances = np.empty(term_months, dtype=np.int64)
+    if term_months == 0:
+        return balances
+    balances[0] = principal
+    block = term_months
+    if rate_units > 0:
+        block = max(MIN_BLOCK, int(np.log(4) / np.log1p(rate_units / RATE_SCALE)))
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        for start in range(0, term_months - 1, block):
+            _block_cents(balances[start:start + block + 1], rate_units, payment)
+    # balance x rate must fit in int64 for every period, or some interest silently wrapped around;
+    # only reachable when the installment overpays and the balance runs far negative
+    if rate_units and np.abs(balances).max() > INT64_MAX // rate_units:
+        raise ValueError("Amounts are too large for exact money mode.")
+    return balances
+
+
+def amortize_cents(principal: int, rate_units: int, term_months: int, payment: int) -> AmortizationSchedule:
+    """Schedule with every amount in int64 cents and totals as exact integer sums.
+
+    Interest is balance x rate rounded half-even to the cent; principal and balance
+    are then exact differences, so nothing drifts however long the term.
+    """
+    check_cents_range(principal, rate_units, term_months, payment)
+    balances = opening_cents(principal, rate_units, term_months, payment)
+    interest = _interest(balances, rate_units)
+    principal_paid = payment - interest
+    remaining = balances - principal_paid
+    payments = np.full(term_months, payment, dtype=np.int64)
+
+    # The final period pays off whatever balance is left
+    if term_months:
+        principal_paid[-1] = balances[-1]
+        payments[-1] = balances[-1] + interest[-1]
+        remaining[-1] = 0
+
+    return AmortizationSchedule(
+        periods=np.arange(1, term_months + 1),
+        payment=payments,
+        principal=principal_paid,
+        interest=interest,
+        remaining_balance=remaining,
+        total_interest=int(interest.sum()),
+        total_payment=int(payments.sum()),
+    )
+
+
+def amortize_exact(principal: float, monthly_rate: float, term_months: int, monthly_payment: float) -> AmortizationSchedule:
+    """Drop-in for amortization.amortize that computes in exact cents.
+
+    Inputs are read as the decimals they were written as (the rate in RATE_SCALE
+    units, so 0.065 / 12 is exactly 6.5% a year again) and the cents are only turned back into floats for serialization; each
+    float is then the closest one to its exact cent value, so JSON shows it exactly.
+    Raises ValueError for inputs the int64 kernel cannot represent.
+    """
+    if not np.isfinite([principal, monthly_rate, monthly_payment]).all():
+        raise ValueError("Exact money mode needs finite amounts and rate.")
+    schedule = amortize_cents(to_cents(principal), to_rate_units(monthly_rate), term_months, to_cents(monthly_payment))
+    return schedule._replace(
+        **{field: getattr(schedule, field) / 100 for field in schedule._fields[1:5]},
+        total_interest=schedule.total_interest / 100,
+        total_payment=schedule.total_payment / 100,
+    )
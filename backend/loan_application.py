@@ -1,31 +1,185 @@
-from fastapi import APIRouter, HTTPException
-from models import LoanApplicationRequest, LoanApplicationResponse
+from datetime import datetime
+from functools import lru_cache
+from typing import Literal
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from pydantic import EmailStr
+from models import (LoanApplicationRequest, LoanApplicationResponse, LoanApplicationSummary, LoanApplicationListResponse,
+                    LoanApplicationStatusRequest, PaymentScheduleResponse)
+from amortization import SCHEDULE_COLUMNS
+from schedule_validation import ScheduleValidator, ScheduleValidationError, reference_schedule, first_divergence
+from application_store import LoanApplicationStore
+from payment_schedule import FLOAT64_MEDIA_TYPE, accepted_media_type, schedule_page, schedule_body, schedule_float64_response
+from response_cache import json_response
+from metrics import should_log
+import asyncio
 import base64
-import pandas as pd
+import csv
 import io
+import logging
+import numpy as np
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Most applications returned by one page of the list endpoint
+MAX_PAGE_SIZE = 1000
+
+# Opened on first use, so importing the app never creates the database file
+@lru_cache(maxsize=1)
+def application_store() -> LoanApplicationStore:
+    return LoanApplicationStore()
+
+def log_application(house_ownership, salary_deduction_approval, dependents, employment_duration, rows, verified):
+    # Structured and sampled, so it can be switched off on the hot path with HOT_PATH_LOG_RATE=0
+    if should_log():
+        logger.info(
+            "Loan application received house_ownership=%s salary_deduction_approval=%s dependents=%s "
+            "employment_duration=%s schedule_rows=%s schedule_verified=%s",
+            house_ownership, salary_deduction_approval, dependents, employment_duration, rows, verified
+        )
+
+# Recompute the expected schedule when the client sent every loan parameter
+def get_reference_schedule(principal, monthly_rate, term_months, monthly_payment):
+    if None in (principal, monthly_rate, term_months, monthly_payment):
+        return None
+    try:
+        return reference_schedule(principal, monthly_rate, term_months, monthly_payment)
+    except ScheduleValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid loan parameters: {str(e)}")
+
+def parse_schedule(header, records) -> np.ndarray | None:
+    # Numeric rows in SCHEDULE_COLUMNS order, or None when the upload is not a schedule table
+    try:
+        indexes = [header.index(column) for column in SCHEDULE_COLUMNS]
+        return np.array([[record[index] for index in indexes] for record in records], dtype=float).reshape(-1, len(SCHEDULE_COLUMNS))
+    except (IndexError, ValueError):
+        return None
+
+async def save_application(customer_email, house_ownership, salary_deduction_approval, dependents, employment_duration,
+                           principal, monthly_rate, term_months, monthly_payment, rows, verified, schedule) -> int:
+    application = dict(
+        customer_email=customer_email, house_ownership=house_ownership, salary_deduction_approval=salary_deduction_approval,
+        dependents=dependents, employment_duration=employment_duration, principal=principal, monthly_rate=monthly_rate,
+        term_months=term_months, monthly_payment=monthly_payment, schedule_rows=rows, schedule_verified=verified,
+    )
+    # SQLite calls block, so they run off the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, application_store().insert, application, schedule)
 
 @router.post("/submit_loan_application", response_model=LoanApplicationResponse)
 async def submit_loan_application(request: LoanApplicationRequest):
+    reference = get_reference_schedule(request.principal, request.monthly_rate, request.term_months, request.monthly_payment)
     try:
         # Decode the base64 CSV string
         csv_bytes = base64.b64decode(request.payment_schedule_csv)
-        csv_file = io.StringIO(csv_bytes.decode('utf-8'))
-        
-        # Read the CSV into a pandas DataFrame (optional, for validation/processing)
-        payment_schedule_df = pd.read_csv(csv_file)
+        csv_file = io.StringIO(csv_bytes.decode('utf-8-sig'))
         
-        # Here you would typically save the loan application details and the payment schedule
-        # to a database or perform further processing.
-        # For now, we'll just log the receipt and return a success message.
+        # Plain csv module; pandas is not worth loading in every worker for one small table
+        rows = [record for record in csv.reader(csv_file) if record]
+        if not rows:
+            raise HTTPException(status_code=422, detail="Invalid payment schedule: the file is empty.")
+        header, records = rows[0], rows[1:]
+
+        # Diff the upload against the recomputed schedule column-wise
+        values = parse_schedule(header, records)
+        if reference is not None:
+            if values is None:
+                raise HTTPException(status_code=422, detail=f"Invalid payment schedule: Expected numeric {', '.join(SCHEDULE_COLUMNS)} columns.")
+            divergent = first_divergence(reference, values)
+            if divergent is not None:
+                raise HTTPException(status_code=422, detail=f"Invalid payment schedule: Row {divergent + 1}: Diverges from the recomputed schedule.")
+            if len(values) < len(reference):
+                raise HTTPException(status_code=422, detail=f"Invalid payment schedule: Row {len(values) + 1}: Schedule ends before the loan term.")
         
-        print(f"Loan Application Received for: House Ownership - {request.house_ownership}, "
-              f"Salary Deduction Approval - {request.salary_deduction_approval}, "
-              f"Dependents - {request.dependents}, "
-              f"Employment Duration - {request.employment_duration}")
-        print("Payment Schedule (first 5 rows):\n", payment_schedule_df.head().to_string())
+        application_id = await save_application(
+            request.customer_email, request.house_ownership, request.salary_deduction_approval, request.dependents,
+            request.employment_duration, request.principal, request.monthly_rate, request.term_months, request.monthly_payment,
+            len(records), reference is not None, values
+        )
+        log_application(request.house_ownership, request.salary_deduction_approval, request.dependents,
+                        request.employment_duration, len(records), reference is not None)
 
-        return LoanApplicationResponse(message="Loan application submitted successfully!")
+        return LoanApplicationResponse(message="Loan application submitted successfully!", schedule_verified=reference is not None,
+                                       application_id=application_id)
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to submit loan application: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to submit loan application: {str(e)}") 
+
+@router.post("/submit_loan_application/stream", response_model=LoanApplicationResponse)
+async def submit_loan_application_stream(
+    request: Request,
+    house_ownership: str,
+    salary_deduction_approval: str,
+    dependents: int,
+    employment_duration: str,
+    customer_email: EmailStr | None = None,
+    principal: float | None = None,
+    monthly_rate: float | None = None,
+    term_months: int | None = None,
+    monthly_payment: float | None = None,
+):
+    # The raw text/csv body is parsed and validated chunk by chunk as it arrives
+    reference = get_reference_schedule(principal, monthly_rate, term_months, monthly_payment)
+    validator = ScheduleValidator(reference, keep_rows=True)
+    try:
+        async for chunk in request.stream():
+            validator.feed(chunk)
+        rows = validator.close()
+    except (ScheduleValidationError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid payment schedule: {str(e)}")
+
+    application_id = await save_application(
+        customer_email, house_ownership, salary_deduction_approval, dependents, employment_duration,
+        principal, monthly_rate, term_months, monthly_payment, rows, reference is not None, validator.values()
+    )
+    log_application(house_ownership, salary_deduction_approval, dependents, employment_duration, rows, reference is not None)
+
+    return LoanApplicationResponse(message="Loan application submitted successfully!", schedule_verified=reference is not None,
+                                   application_id=application_id)
+
+@router.get("/applications", response_model=LoanApplicationListResponse)
+def list_applications(
+    customer_email: str | None = None,
+    status: Literal["submitted", "approved", "rejected"] | None = None,
+    submitted_from: datetime | None = None,
+    submitted_to: datetime | None = None,
+    before: int | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+):
+    # Newest first, keyset-paginated on the id; schedules are not read
+    rows = application_store().search(customer_email, status, submitted_from, submitted_to, before, limit)
+    # Serialized here so FastAPI does not validate a thousand summaries a second time
+    return json_response(LoanApplicationListResponse(
+        applications=[LoanApplicationSummary(**row) for row in rows],
+        next_cursor=rows[-1]["id"] if len(rows) == limit else None,
+    ).model_dump_json().encode())
+
+@router.get("/applications/{application_id}", response_model=LoanApplicationSummary)
+def get_application(application_id: int):
+    row = application_store().get(application_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Loan application not found.")
+    return LoanApplicationSummary(**row)
+
+@router.get("/applications/{application_id}/schedule", response_model=PaymentScheduleResponse)
+def get_application_schedule(
+    application_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1),
+    accept: str | None = Header(None),
+):
+    # Same formats and paging as /api/v4/generate_payment_schedule
+    schedule = application_store().schedule(application_id)
+    if schedule is None:
+        raise HTTPException(status_code=404, detail="No payment schedule stored for this application.")
+    media_type = accepted_media_type(accept)
+    page = schedule_page(schedule, offset, limit)
+    if media_type == FLOAT64_MEDIA_TYPE:
+        return schedule_float64_response(page, len(schedule.periods), offset)
+    return Response(content=schedule_body(page, len(schedule.periods), offset, media_type), media_type=media_type)
+
+@router.put("/applications/{application_id}/status", response_model=LoanApplicationSummary)
+def set_application_status(application_id: int, request: LoanApplicationStatusRequest):
+    if not application_store().set_status(application_id, request.status):
+        raise HTTPException(status_code=404, detail="Loan application not found.")
+    return LoanApplicationSummary(**application_store().get(application_id))
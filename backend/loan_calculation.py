@@ -1,9 +1,16 @@
-from fastapi import APIRouter
-from models import LoanRequest, LoanResponse
+from fastapi import APIRouter, HTTPException
+from models import LoanRequest, LoanResponse, LoanBatchRequest, LoanBatchResponse, LoanScheduleResponse, PaymentScheduleColumnsResponse, SweepRange, LoanSweepRequest, LoanSweepResponse
+import numpy as np
+from amortization import SCHEDULE_COLUMNS, amortize
+from payment_schedule import check_payment_covers_interest
+from response_cache import response_cache, cache_key, json_response
 
 
 router = APIRouter()
 
+# Largest rate x term x extra payment grid one sweep may ask for
+MAX_SWEEP_CELLS = 1_000_000
+
 # function for calculating monthly payment using the loan amortization formula
 def calculate_monthly_payment(principal: float, monthly_rate: float, term_months: int) -> float:
     if monthly_rate == 0:
@@ -12,12 +19,70 @@ def calculate_monthly_payment(principal: float, monthly_rate: float, term_months
         return principal * (monthly_rate * (1 + monthly_rate) ** term_months) / ((1 + monthly_rate) ** term_months - 1)
 
 
-@router.post("/calculate_loan", response_model=LoanResponse)
-def calculate_loan(request: LoanRequest):
-    loan_amount = request.loan_amount
-    interest_rate = request.interest_rate
-    loan_term_months = request.loan_term_months
+# same formula as calculate_monthly_payment, applied to whole arrays of loans at once
+def calculate_monthly_payments(principal: np.ndarray, monthly_rate: np.ndarray, term_months: np.ndarray) -> np.ndarray:
+    zero_rate = monthly_rate == 0
+    # Substitute a dummy rate where it is zero so the annuity branch never divides by zero
+    rate = np.where(zero_rate, 1.0, monthly_rate)
+    with np.errstate(over="ignore", invalid="ignore"):
+        growth = (1 + rate) ** term_months
+        return np.where(zero_rate, principal / term_months, principal * rate * growth / (growth - 1))
+
+
+# months to clear `principal` paying `installment` a month, and the total interest paid on the way;
+# never more than `term_months`, and the last month only pays what is left, as in amortize
+def payoff_with_installment(principal, monthly_rate: np.ndarray, installment: np.ndarray, term_months: np.ndarray):
+    # An installment that does not beat the first month's interest never pays anything off
+    if not np.all(installment > principal * monthly_rate):
+        raise ValueError("An installment is too low to cover the interest, so the balance never reaches zero.")
+    zero_rate = monthly_rate == 0
+    rate = np.where(zero_rate, 1.0, monthly_rate)
+    log_growth = np.log1p(rate)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exact_months = np.where(zero_rate, principal / installment, -np.log1p(-rate * principal / installment) / log_growth)
+        # Shave float noise so a loan that ends exactly on a month is not given an extra one
+        months = np.clip(np.ceil(exact_months - 1e-9), 1, term_months)
+        growth = np.exp((months - 1) * log_growth)
+        balance = np.where(zero_rate, principal - installment * (months - 1), principal * growth - installment * (growth - 1) / rate)
+    final_payment = np.where(zero_rate, balance, balance * (1 + monthly_rate))
+    return months.astype(np.int64), installment * (months - 1) + final_payment - principal
+
+
+# A float, since a huge range overflows to inf and int() would raise; checked against
+# MAX_SWEEP_CELLS before anything is allocated
+def sweep_count(sweep: SweepRange) -> float:
+    with np.errstate(over="ignore"):
+        return float(np.floor((sweep.stop - sweep.start) / sweep.step + 1e-9)) + 1
+
 
+def sweep_values(sweep: SweepRange) -> np.ndarray:
+    return np.round(sweep.start + sweep.step * np.arange(int(sweep_count(sweep))), 10)
+
+
+def sweep_loans(loan_amount: float, interest_rates: np.ndarray, loan_term_months: np.ndarray, extra_payments: np.ndarray | None = None) -> dict:
+    """Payment and total interest for every rate x term pair, by broadcasting a rate column against a term row.
+
+    With extra payments, each one adds a leading axis giving the payoff month and total
+    interest when that amount is paid on top of the installment. The installment is the
+    unrounded one the totals use, so an extra payment of 0 pays off in exactly the term
+    with the same total interest.
+    """
+    monthly_rates = interest_rates[:, None] / 100 / 12
+    monthly_payments = calculate_monthly_payments(loan_amount, monthly_rates, loan_term_months[None, :])
+    grid = {
+        "monthly_payments": np.round(monthly_payments, 2),
+        # + 0.0 turns the -0.0 of zero-rate loans into 0.0
+        "total_interests": np.round(monthly_payments * loan_term_months - loan_amount, 2) + 0.0,
+    }
+    if extra_payments is not None:
+        installments = monthly_payments + extra_payments[:, None, None]
+        payoff_months, total_interests = payoff_with_installment(loan_amount, monthly_rates, installments, loan_term_months[None, :])
+        grid["payoff_months"] = payoff_months
+        grid["total_interests_with_extra"] = np.round(total_interests, 2) + 0.0
+    return grid
+
+
+def quote_loan(loan_amount: float, interest_rate: float, loan_term_months: int) -> LoanResponse:
     # Calculate monthly payment 
     monthly_rate = interest_rate / 100 / 12
     monthly_payment = calculate_monthly_payment(
@@ -31,3 +96,96 @@ def calculate_loan(request: LoanRequest):
         total_interest=round((monthly_payment * loan_term_months) - loan_amount, 2),
         total_payment=round(monthly_payment * loan_term_months, 2)
     )
+
+
+@router.post("/calculate_loan", response_model=LoanResponse)
+def calculate_loan(request: LoanRequest):
+    key = cache_key("calculate_loan", request.loan_amount, request.interest_rate, request.loan_term_months)
+    body = response_cache.get(key)
+    if body is None:
+        body = quote_loan(request.loan_amount, request.interest_rate, request.loan_term_months).model_dump_json().encode()
+        response_cache.put(key, body)
+    return json_response(body)
+
+
+# Quote and columnar schedule in one round trip, for clients that always want both
+@router.post("/calculate_loan_with_schedule", response_model=LoanScheduleResponse)
+def calculate_loan_with_schedule(request: LoanRequest):
+    key = cache_key("calculate_loan_with_schedule", request.loan_amount, request.interest_rate, request.loan_term_months)
+    body = response_cache.get(key)
+    if body is None:
+        quote = quote_loan(request.loan_amount, request.interest_rate, request.loan_term_months)
+        monthly_rate = request.interest_rate / 100 / 12
+        check_payment_covers_interest(request.loan_amount, monthly_rate, quote.monthly_payment)
+        schedule = amortize(request.loan_amount, monthly_rate, request.loan_term_months, quote.monthly_payment)
+        body = LoanScheduleResponse(
+            quote=quote,
+            schedule=PaymentScheduleColumnsResponse(
+                columns={name: column.tolist() for name, column in zip(SCHEDULE_COLUMNS, schedule)},
+                total_interest=schedule.total_interest,
+                total_payment=schedule.total_payment,
+                total_periods=request.loan_term_months
+            )
+        ).model_dump_json().encode()
+        response_cache.put(key, body)
+    return json_response(body)
+
+
+@router.post("/calculate_loan/sweep", response_model=LoanSweepResponse)
+def calculate_loan_sweep(request: LoanSweepRequest):
+    for name, sweep in (("interest_rates", request.interest_rates), ("loan_term_months", request.loan_term_months)):
+        if not np.isfinite([sweep.start, sweep.stop, sweep.step]).all() or sweep.step <= 0 or sweep.stop < sweep.start:
+            raise HTTPException(status_code=400, detail=f"{name} needs a positive step and stop >= start.")
+    # Sized before anything is allocated
+    extra_count = 1 if not request.extra_payments else len(request.extra_payments)
+    cells = sweep_count(request.interest_rates) * sweep_count(request.loan_term_months) * extra_count
+    if cells > MAX_SWEEP_CELLS:
+        size = f"{cells:.0f}" if np.isfinite(cells) else "too many"
+        raise HTTPException(status_code=400, detail=f"Sweep has {size} cells; the limit is {MAX_SWEEP_CELLS}.")
+
+    interest_rates = sweep_values(request.interest_rates)
+    loan_term_months = sweep_values(request.loan_term_months)
+    extra_payments = None if request.extra_payments is None else np.asarray(request.extra_payments, dtype=np.float64)
+    if request.loan_amount <= 0:
+        raise HTTPException(status_code=400, detail="Loan amount must be greater than zero.")
+    if interest_rates[0] < 0:
+        raise HTTPException(status_code=400, detail="Interest rates cannot be negative.")
+    if loan_term_months[0] < 1 or np.any(loan_term_months != np.round(loan_term_months)):
+        raise HTTPException(status_code=400, detail="Loan terms must be whole months of at least 1.")
+    if extra_payments is not None and not np.all(extra_payments >= 0):
+        raise HTTPException(status_code=400, detail="Extra payments cannot be negative.")
+
+    loan_term_months = loan_term_months.astype(np.int64)
+    try:
+        grid = sweep_loans(request.loan_amount, interest_rates, loan_term_months, extra_payments)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Serialized once here; letting FastAPI re-validate the nested lists costs more than the sweep
+    return json_response(LoanSweepResponse(
+        interest_rates=interest_rates.tolist(),
+        loan_term_months=loan_term_months.tolist(),
+        extra_payments=None if extra_payments is None else extra_payments.tolist(),
+        **{name: values.tolist() for name, values in grid.items()}
+    ).model_dump_json().encode())
+
+
+@router.post("/calculate_loan/batch", response_model=LoanBatchResponse)
+def calculate_loan_batch(request: LoanBatchRequest):
+    if not len(request.loan_amounts) == len(request.interest_rates) == len(request.loan_term_months):
+        raise HTTPException(status_code=400, detail="loan_amounts, interest_rates and loan_term_months must have the same length.")
+
+    loan_amounts = np.asarray(request.loan_amounts, dtype=np.float64)
+    monthly_rates = np.asarray(request.interest_rates, dtype=np.float64) / 100 / 12
+    loan_term_months = np.asarray(request.loan_term_months, dtype=np.int64)
+    if np.any(loan_term_months <= 0):
+        raise HTTPException(status_code=400, detail="Loan term must be greater than zero.")
+
+    # Price every loan in one vectorized pass
+    monthly_payments = calculate_monthly_payments(loan_amounts, monthly_rates, loan_term_months)
+    total_payments = monthly_payments * loan_term_months
+
+    return LoanBatchResponse(
+        monthly_payments=np.round(monthly_payments, 2).tolist(),
+        total_interests=np.round(total_payments - loan_amounts, 2).tolist(),
+        total_payments=np.round(total_payments, 2).tolist()
+    )
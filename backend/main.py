@@ -1,10 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from advance_salary import router as salary_router
 from customer_info import router as customer_router
 from loan_calculation import router as loan_router
 from payment_schedule import router as payment_router
 from loan_application import router as loan_application_router
+from models import ResponseCacheStatsResponse
+from response_cache import response_cache
+from metrics import MetricsMiddleware, render_metrics
 
 app = FastAPI(title="Salary Advance Calculator API")
 
@@ -17,6 +21,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and payload size histograms, served at /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(salary_router, prefix="/api/v2")
 app.include_router(customer_router, prefix="/api/v1")
@@ -26,4 +33,12 @@ app.include_router(loan_application_router, prefix="/api/v5")
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to Salary Advance Calculator API"}
\ No newline at end of file
+    return {"message": "Welcome to Salary Advance Calculator API"}
+
+@app.get("/cache/stats", response_model=ResponseCacheStatsResponse)
+async def get_response_cache_stats():
+    return ResponseCacheStatsResponse(**response_cache.stats())
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,144 @@
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Share of per-request log lines that are written; 0 switches them off on the hot path
+HOT_PATH_LOG_RATE = float(os.environ.get("HOT_PATH_LOG_RATE", "1.0"))
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+
+def should_log() -> bool:
+    return HOT_PATH_LOG_RATE >= 1 or (HOT_PATH_LOG_RATE > 0 and random.random() < HOT_PATH_LOG_RATE)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per-bucket counts plus the +Inf bucket, the sum and the count
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *label_values):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                bucket_label = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, bucket_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route.", ("method", "route", "status"))
+REQUEST_SIZE = Histogram("http_request_size_bytes", "Request body size by route.", ("method", "route"), SIZE_BUCKETS)
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "Response body size by route.", ("method", "route"), SIZE_BUCKETS)
+REQUESTS_TOTAL = Counter("http_requests_total", "Requests by route and status.", ("method", "route", "status"))
+LOCK_WAIT = Histogram("customer_file_lock_wait_seconds", "Time spent waiting for the customer data FileLock.", ("operation",),
+                      (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0, 10.0))
+SCHEDULE_STAGE = Histogram("payment_schedule_stage_seconds", "Time per stage of generate_payment_schedule.", ("stage",))
+
+REGISTRY = (REQUEST_LATENCY, REQUESTS_TOTAL, REQUEST_SIZE, RESPONSE_SIZE, LOCK_WAIT, SCHEDULE_STAGE)
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+def _header(headers: list, name: bytes) -> bytes | None:
+    return next((value for key, value in headers if key.lower() == name), None)
+
+
+class MetricsMiddleware:
+    """Per-route latency, request count and payload sizes, timed to the start of the response.
+
+    Plain ASGI rather than @app.middleware("http"): that wrapper reads receive() itself
+    while a streaming response is sent, taking the request body chunks away from an
+    endpoint that is still reading them (the payroll batch scorer answers while the file
+    is still uploading).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+
+        async def observe_and_send(message):
+            if message["type"] == "http.response.start":
+                self.observe(scope, message, time.perf_counter() - start)
+            await send(message)
+
+        await self.app(scope, receive, observe_and_send)
+
+    @staticmethod
+    def observe(scope, message, elapsed: float):
+        # Label by route template, not raw path, so /get-customer/{email} stays one series;
+        # the router has already stored the matched route in the shared scope
+        route = scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        method = scope["method"]
+        status = message["status"]
+        REQUEST_LATENCY.observe(elapsed, method, path, status)
+        REQUESTS_TOTAL.inc(method, path, status)
+        request_size = _header(scope["headers"], b"content-length")
+        if request_size is not None:
+            REQUEST_SIZE.observe(int(request_size), method, path)
+        response_size = _header(message.get("headers", []), b"content-length")
+        if response_size is not None:
+            RESPONSE_SIZE.observe(int(response_size), method, path)
@@ -1,9 +1,12 @@
+from datetime import datetime
+from typing import Literal
 from pydantic import BaseModel, EmailStr, Field
 
 class SalaryAdvanceRequest(BaseModel):
     gross_salary: float
     pay_frequency: str  # monthly, biweekly, weekly
     requested_amount: float
+    employer: str | None = None  # selects employer-specific products, if any
 
 class SalaryAdvanceResponse(BaseModel):
     eligible: bool
@@ -13,6 +16,24 @@ class SalaryAdvanceResponse(BaseModel):
     total_repayable: float
     monthly_salary: float
 
+class SalaryAdvanceBatchRequest(BaseModel):
+    gross_salary: list[float]
+    pay_frequency: list[str]
+    requested_amount: list[float]
+    employer: list[str] | None = None
+
+class SalaryAdvanceBatchResponse(BaseModel):
+    eligible: list[bool]
+    max_advance: list[float]
+    approved_amount: list[float]
+    fee: list[float]
+    total_repayable: list[float]
+    monthly_salary: list[float]
+    error: list[str]
+
+class ProductReloadResponse(BaseModel):
+    reloaded: bool
+
 class LoanRequest(BaseModel):
     loan_amount: float
     interest_rate: float
@@ -23,16 +44,71 @@ class LoanResponse(BaseModel):
     total_interest: float
     total_payment: float
 
+class LoanBatchRequest(BaseModel):
+    loan_amounts: list[float]
+    interest_rates: list[float]
+    loan_term_months: list[int]
+
+class LoanBatchResponse(BaseModel):
+    monthly_payments: list[float]
+    total_interests: list[float]
+    total_payments: list[float]
+
+class SweepRange(BaseModel):
+    start: float
+    stop: float  # inclusive
+    step: float
+
+class LoanSweepRequest(BaseModel):
+    loan_amount: float
+    interest_rates: SweepRange  # annual, in percent
+    loan_term_months: SweepRange
+    extra_payments: list[float] | None = None  # paid on top of each installment
+
+class LoanSweepResponse(BaseModel):
+    interest_rates: list[float]
+    loan_term_months: list[int]
+    # Indexed [rate][term]
+    monthly_payments: list[list[float]]
+    total_interests: list[list[float]]
+    # Indexed [extra payment][rate][term], only when extra_payments was given
+    extra_payments: list[float] | None = None
+    payoff_months: list[list[list[int]]] | None = None
+    total_interests_with_extra: list[list[list[float]]] | None = None
+
 class PaymentScheduleRequest(BaseModel):
     principal: float
     monthly_rate: float
     term_months: int
     monthly_payment: float
 
+class ScheduleEvent(BaseModel):
+    period: int
+    kind: Literal["rate_change", "prepayment"]
+    monthly_rate: float | None = None  # rate_change: the new rate
+    monthly_payment: float | None = None  # rate_change: new installment, recast over the remaining term if omitted
+    amount: float | None = None  # prepayment: paid on top of the installment
+
+class EventScheduleRequest(PaymentScheduleRequest):
+    events: list[ScheduleEvent] = []
+
 class PaymentScheduleResponse(BaseModel):
     schedule: list[dict]
     total_interest: float
     total_payment: float
+    total_periods: int | None = None
+    offset: int = 0
+
+class PaymentScheduleColumnsResponse(BaseModel):
+    columns: dict[str, list[int] | list[float]]
+    total_interest: float
+    total_payment: float
+    total_periods: int
+    offset: int = 0
+
+class LoanScheduleResponse(BaseModel):
+    quote: LoanResponse
+    schedule: PaymentScheduleColumnsResponse
 
 class CustomerInfo(BaseModel):
     full_name: str = Field(..., min_length=1, max_length=100)
@@ -45,6 +121,34 @@ class CustomerInfo(BaseModel):
 class CustomerResponse(BaseModel):
     message: str
 
+class CustomerImportError(BaseModel):
+    line: int
+    detail: str
+
+class CustomerImportResponse(BaseModel):
+    imported: int
+    duplicates: int
+    invalid: int
+    # Per-line problems, capped so a bad file cannot grow the response without bound
+    errors: list[CustomerImportError]
+
+class CacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+
+class ResponseCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+    entries: int
+    max_entries: int
+    bytes: int
+    max_bytes: int
+
 class CustomerData(BaseModel):
     full_name: str
     employment_status: str
@@ -63,6 +167,38 @@ class LoanApplicationRequest(BaseModel):
     dependents: int
     employment_duration: str
     payment_schedule_csv: str # This will hold the base64 encoded CSV string
+    customer_email: EmailStr | None = None  # Links the application to a saved customer
+    # Loan parameters the schedule was generated from; when given, the schedule is recomputed and checked
+    principal: float | None = None
+    monthly_rate: float | None = None
+    term_months: int | None = None
+    monthly_payment: float | None = None
 
 class LoanApplicationResponse(BaseModel):
     message: str
+    schedule_verified: bool = False
+    application_id: int | None = None
+
+class LoanApplicationSummary(BaseModel):
+    id: int
+    submitted_at: datetime
+    status: str
+    customer_email: str | None = None
+    house_ownership: str
+    salary_deduction_approval: str
+    dependents: int
+    employment_duration: str
+    principal: float | None = None
+    monthly_rate: float | None = None
+    term_months: int | None = None
+    monthly_payment: float | None = None
+    schedule_rows: int
+    schedule_verified: bool
+
+class LoanApplicationListResponse(BaseModel):
+    applications: list[LoanApplicationSummary]
+    # Pass as `before` to fetch the next page; None on the last page
+    next_cursor: int | None = None
+
+class LoanApplicationStatusRequest(BaseModel):
+    status: Literal["submitted", "approved", "rejected"]
@@ -1,19 +1,26 @@
-from fastapi import APIRouter, HTTPException
-from models import PaymentScheduleRequest, PaymentScheduleResponse
+import csv
+import io
+import json
+from typing import Literal
 import numpy as np
-import pandas as pd
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from models import PaymentScheduleRequest, PaymentScheduleResponse, PaymentScheduleColumnsResponse, EventScheduleRequest
+from amortization import SCHEDULE_COLUMNS, amortize, iter_amortize, schedule_records
+from exact_amortization import amortize_exact
+from schedule_events import Event, RATE_CHANGE, scheduler
+from response_cache import response_cache, cache_key
+from metrics import SCHEDULE_STAGE
 
 
 router = APIRouter()
 
-@router.post("/generate_payment_schedule", response_model=PaymentScheduleResponse)
-def generate_payment_schedule(request: PaymentScheduleRequest):
-    principal = request.principal
-    monthly_rate = request.monthly_rate
-    term_months = request.term_months
-    monthly_payment = request.monthly_payment
+# Opt-in compact formats, selected with the Accept header
+COLUMNS_MEDIA_TYPE = "application/vnd.schedule.columns+json"
+FLOAT64_MEDIA_TYPE = "application/vnd.schedule.float64"
 
-    # Edge Case: Prevent negative amortization
+# Edge Case: Prevent negative amortization
+def check_payment_covers_interest(principal: float, monthly_rate: float, monthly_payment: float):
     min_payment = principal * monthly_rate
     if monthly_rate > 0 and monthly_payment <= min_payment:
         raise HTTPException(
@@ -21,35 +28,151 @@ def generate_payment_schedule(request: PaymentScheduleRequest):
             detail="Monthly payment is too low to cover the interest. Balance will never reach zero."
         )
 
-    # Efficient array operations with NumPy for performance
-    periods = np.arange(1, term_months + 1)
-    remaining_balance = np.zeros(term_months + 1)
-    interest_payment = np.zeros(term_months)
-    principal_payment = np.zeros(term_months)
-
-    remaining_balance[0] = principal
-
-    for i in range(term_months):
-        # Calculate interest and principal, rounding for consistency
-        interest_payment[i] = round(remaining_balance[i] * monthly_rate, 2)
-        principal_payment[i] = round(monthly_payment - interest_payment[i], 2)
-        if i < term_months - 1:
-            remaining_balance[i + 1] = round(remaining_balance[i] - principal_payment[i], 2)
-
-    # Rounding for display and calculations is now consistent
-    df = pd.DataFrame({
-        "Period": periods,
-        "Payment": np.round([monthly_payment] * term_months, 2),
-        "Principal": principal_payment,
-        "Interest": interest_payment,
-        "Remaining Balance": np.round(remaining_balance[1:], 2)
-    })
+def accepted_media_type(accept: str | None) -> str:
+    return next((media for media in (COLUMNS_MEDIA_TYPE, FLOAT64_MEDIA_TYPE) if media in (accept or "")), "application/json")
 
-    total_interest = float(np.round(np.sum(interest_payment), 2))
-    total_payment = float(np.round(monthly_payment * term_months, 2))
+def schedule_page(schedule, offset: int, limit: int | None):
+    end = None if limit is None else offset + limit
+    return schedule._replace(**{field: getattr(schedule, field)[offset:end] for field in schedule._fields[:5]})
 
+def schedule_body(page, total_periods: int, offset: int, media_type: str) -> bytes:
+    if media_type == COLUMNS_MEDIA_TYPE:
+        return schedule_columns_body(page, total_periods, offset)
     return PaymentScheduleResponse(
-        schedule=df.to_dict(orient="records"),
-        total_interest=total_interest,
-        total_payment=total_payment
-    )
\ No newline at end of file
+        schedule=schedule_records(page),
+        total_interest=page.total_interest,
+        total_payment=page.total_payment,
+        total_periods=total_periods,
+        offset=offset
+    ).model_dump_json().encode()
+
+def schedule_columns_body(schedule, total_periods: int, offset: int) -> bytes:
+    # Column arrays instead of one dict per row, so keys are not repeated per period
+    return PaymentScheduleColumnsResponse(
+        columns={name: column.tolist() for name, column in zip(SCHEDULE_COLUMNS, schedule)},
+        total_interest=schedule.total_interest,
+        total_payment=schedule.total_payment,
+        total_periods=total_periods,
+        offset=offset
+    ).model_dump_json().encode()
+
+def schedule_float64_response(schedule, total_periods: int, offset: int) -> Response:
+    # Raw little-endian float64 columns laid out one after another, totals in headers
+    body = np.stack(schedule[:5]).astype("<f8", copy=False).tobytes()
+    return Response(content=body, media_type=FLOAT64_MEDIA_TYPE, headers={
+        "X-Schedule-Columns": ",".join(SCHEDULE_COLUMNS),
+        "X-Schedule-Rows": str(len(schedule.periods)),
+        "X-Total-Interest": repr(schedule.total_interest),
+        "X-Total-Payment": repr(schedule.total_payment),
+        "X-Total-Periods": str(total_periods),
+        "X-Offset": str(offset),
+    })
+
+@router.post("/generate_payment_schedule", response_model=PaymentScheduleResponse)
+def generate_payment_schedule(
+    request: PaymentScheduleRequest,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1),
+    money: Literal["float", "exact"] = "float",
+    accept: str | None = Header(None),
+):
+    principal = request.principal
+    monthly_rate = request.monthly_rate
+    term_months = request.term_months
+    monthly_payment = request.monthly_payment
+
+    media_type = accepted_media_type(accept)
+    # Float64 bodies are a straight copy of the arrays, so there is nothing worth caching
+    key = cache_key("generate_payment_schedule", principal, monthly_rate, term_months, monthly_payment, offset, limit, media_type, money)
+    body = response_cache.get(key) if media_type != FLOAT64_MEDIA_TYPE else None
+    if body is not None:
+        return Response(content=body, media_type=media_type)
+
+    check_payment_covers_interest(principal, monthly_rate, monthly_payment)
+
+    # Closed-form NumPy amortization; only the requested page is serialized.
+    # money=exact runs the int64-cent kernel instead, which cannot drift by a cent
+    with SCHEDULE_STAGE.time("compute"):
+        if money == "exact":
+            try:
+                schedule = amortize_exact(principal, monthly_rate, term_months, monthly_payment)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        else:
+            schedule = amortize(principal, monthly_rate, term_months, monthly_payment)
+        page = schedule_page(schedule, offset, limit)
+
+    with SCHEDULE_STAGE.time("serialize"):
+        if media_type == FLOAT64_MEDIA_TYPE:
+            return schedule_float64_response(page, term_months, offset)
+        body = schedule_body(page, term_months, offset, media_type)
+    response_cache.put(key, body)
+    return Response(content=body, media_type=media_type)
+
+def schedule_events(request: EventScheduleRequest) -> list[Event]:
+    events = []
+    rate_change_periods = set()
+    for event in request.events:
+        if not 1 <= event.period <= request.term_months:
+            raise HTTPException(status_code=400, detail=f"Event period {event.period} is outside the loan term.")
+        if event.kind == RATE_CHANGE:
+            if event.monthly_rate is None or not event.monthly_rate >= 0 or event.period in rate_change_periods:
+                raise HTTPException(status_code=400, detail=f"Period {event.period}: a rate change needs one non-negative monthly_rate.")
+            if event.monthly_payment is not None and not event.monthly_payment > 0:
+                raise HTTPException(status_code=400, detail=f"Period {event.period}: monthly_payment must be greater than zero.")
+            rate_change_periods.add(event.period)
+            events.append(Event(event.period, event.kind, event.monthly_rate, event.monthly_payment))
+        else:
+            if event.amount is None or not event.amount > 0:
+                raise HTTPException(status_code=400, detail=f"Period {event.period}: a prepayment needs an amount greater than zero.")
+            events.append(Event(event.period, event.kind, event.amount))
+    return events
+
+@router.post("/generate_payment_schedule/events", response_model=PaymentScheduleResponse)
+def generate_event_schedule(
+    request: EventScheduleRequest,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1),
+    accept: str | None = Header(None),
+):
+    check_payment_covers_interest(request.principal, request.monthly_rate, request.monthly_payment)
+    events = schedule_events(request)
+    media_type = accepted_media_type(accept)
+
+    # Edits to a loan's event list only recompute from the earliest period they touch
+    with SCHEDULE_STAGE.time("compute"):
+        try:
+            schedule = scheduler.schedule(request.principal, request.monthly_rate, request.term_months, request.monthly_payment, events).schedule
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        total_periods = len(schedule.periods)
+        page = schedule_page(schedule, offset, limit)
+
+    with SCHEDULE_STAGE.time("serialize"):
+        if media_type == FLOAT64_MEDIA_TYPE:
+            return schedule_float64_response(page, total_periods, offset)
+        return Response(content=schedule_body(page, total_periods, offset, media_type), media_type=media_type)
+
+def ndjson_rows(blocks):
+    for block in blocks:
+        yield "".join(json.dumps(row) + "\n" for row in schedule_records(block))
+
+def csv_rows(blocks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(SCHEDULE_COLUMNS)
+    for block in blocks:
+        writer.writerows(zip(*(column.tolist() for column in block[:5])))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+@router.post("/generate_payment_schedule/stream")
+def stream_payment_schedule(request: PaymentScheduleRequest, format: Literal["ndjson", "csv"] = "ndjson"):
+    check_payment_covers_interest(request.principal, request.monthly_rate, request.monthly_payment)
+
+    # Rows are computed block by block while the response is being sent
+    blocks = iter_amortize(request.principal, request.monthly_rate, request.term_months, request.monthly_payment)
+    if format == "csv":
+        return StreamingResponse(csv_rows(blocks), media_type="text/csv")
+    return StreamingResponse(ndjson_rows(blocks), media_type="application/x-ndjson")
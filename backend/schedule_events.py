@@ -0,0 +1,185 @@
+import os
+from typing import NamedTuple
+import numpy as np
+from amortization import AmortizationSchedule, opening_balances, _step
+from lru import LRUCache
+
+# Loans whose last event schedule is kept for incremental what-if edits, per worker
+EVENT_CACHE_SIZE = int(os.environ.get("EVENT_SCHEDULE_CACHE_SIZE", "1024"))
+
+RATE_CHANGE = "rate_change"
+PREPAYMENT = "prepayment"
+# Within one period the rate changes first (at the start) and prepayments land last
+EVENT_ORDER = {RATE_CHANGE: 0, PREPAYMENT: 1}
+
+
+class Event(NamedTuple):
+    period: int
+    kind: str
+    # rate_change: new monthly rate and, optionally, new installment; prepayment: amount
+    value: float
+    monthly_payment: float | None = None
+
+
+class EventSchedule(NamedTuple):
+    schedule: AmortizationSchedule
+    # Monthly rate and regular installment in effect in each period
+    rates: np.ndarray
+    installments: np.ndarray
+
+
+def sort_events(events) -> tuple[Event, ...]:
+    return tuple(sorted(events, key=lambda event: (event.period, EVENT_ORDER[event.kind], event.value, event.monthly_payment or 0.0)))
+
+
+def recast_payment(balance: float, monthly_rate: float, months: int) -> float:
+    # Installment that clears `balance` over the remaining months at the new rate
+    if monthly_rate == 0:
+        return round(balance / months, 2)
+    return round(balance * monthly_rate / (1 - (1 + monthly_rate) ** -months), 2)
+
+
+def _segment(balance, monthly_rate, monthly_payment, first_period, count, final):
+    # Rows first_period .. first_period + count - 1 at a fixed rate and installment;
+    # stops at the period that clears the balance, or pays off at the end of the term
+    balances = opening_balances(balance, monthly_rate, count, monthly_payment)
+    interest, principal, remaining = _step(balances, monthly_rate, monthly_payment)
+    payment = np.full(count, np.round(monthly_payment, 2))
+
+    cleared = np.flatnonzero(remaining <= 0)
+    end = int(cleared[0]) + 1 if cleared.size else count
+    paid_off = cleared.size > 0 or final
+    if paid_off:
+        last = end - 1
+        principal[last] = balances[last]
+        payment[last] = np.round(balances[last] + interest[last], 2)
+        remaining[last] = 0.0
+    periods = np.arange(first_period, first_period + end)
+    return (periods, payment[:end], principal[:end], interest[:end], remaining[:end]), paid_off
+
+
+def amortize_with_events(principal: float, monthly_rate: float, term_months: int, monthly_payment: float, events, prior: EventSchedule | None = None, start_period: int = 1) -> EventSchedule:
+    """Schedule with rate changes and prepayments, vectorized between consecutive events.
+
+    A rate change applies from the start of its period; without its own installment the
+    payment is recast to clear the balance over the rest of the term. A prepayment is
+    paid on top of the installment at the end of its period, so the loan ends sooner.
+    With `prior`, rows before `start_period` are reused from it and only the rest is
+    computed; the caller guarantees the events before `start_period` are unchanged.
+    """
+    events = [event for event in sort_events(events) if event.period >= start_period]
+    prefix = 0
+    if prior is not None and start_period > 1:
+        prefix = start_period - 1
+        balance = float(prior.schedule.remaining_balance[prefix - 1])
+        monthly_rate = float(prior.rates[prefix - 1])
+        monthly_payment = float(prior.installments[prefix - 1])
+    else:
+        balance, start_period = principal, 1
+
+    columns = [[] for _ in range(5)]
+    rates, installments = [], []
+    if prefix:
+        for column, values in zip(columns, prior.schedule[:5]):
+            column.append(values[:prefix])
+        rates.append(prior.rates[:prefix])
+        installments.append(prior.installments[:prefix])
+    period = start_period
+    index = 0
+
+    while period <= term_months and balance > 0:
+        while index < len(events) and events[index].period == period and events[index].kind == RATE_CHANGE:
+            event = events[index]
+            monthly_rate = event.value
+            monthly_payment = event.monthly_payment if event.monthly_payment is not None else recast_payment(balance, monthly_rate, term_months - period + 1)
+            index += 1
+        if monthly_rate > 0 and monthly_payment <= balance * monthly_rate:
+            raise ValueError(f"Period {period}: monthly payment is too low to cover the interest.")
+
+        # The segment runs up to the next prepayment, or up to the period before the next rate change
+        end = term_months
+        if index < len(events):
+            upcoming = events[index]
+            end = upcoming.period if upcoming.kind == PREPAYMENT else upcoming.period - 1
+        rows, paid_off = _segment(balance, monthly_rate, monthly_payment, period, end - period + 1, end == term_months)
+        last = len(rows[0]) - 1
+
+        while not paid_off and index < len(events) and events[index].period == end and events[index].kind == PREPAYMENT:
+            amount = min(round(events[index].value, 2), rows[4][last])
+            rows[1][last] = np.round(rows[1][last] + amount, 2)
+            rows[2][last] = np.round(rows[2][last] + amount, 2)
+            rows[4][last] = np.round(rows[4][last] - amount, 2)
+            paid_off = rows[4][last] <= 0
+            index += 1
+
+        for column, values in zip(columns, rows):
+            column.append(values)
+        rates.append(np.full(last + 1, monthly_rate))
+        installments.append(np.full(last + 1, round(monthly_payment, 2)))
+        balance = 0.0 if paid_off else float(rows[4][last])
+        period = end + 1
+
+    periods, payment, principal_paid, interest, remaining = (np.concatenate(column) if column else np.empty(0) for column in columns)
+    return EventSchedule(
+        schedule=AmortizationSchedule(
+            periods=periods.astype(np.int64),
+            payment=payment,
+            principal=principal_paid,
+            interest=interest,
+            remaining_balance=remaining,
+            total_interest=float(np.round(np.sum(interest), 2)),
+            total_payment=float(np.round(np.sum(payment), 2)),
+        ),
+        rates=np.concatenate(rates) if rates else np.empty(0),
+        installments=np.concatenate(installments) if installments else np.empty(0),
+    )
+
+
+def first_affected_period(previous: tuple[Event, ...], events: tuple[Event, ...]) -> int | None:
+    """Earliest period whose rows can differ between two sorted event lists, or None if they match."""
+    for old, new in zip(previous, events):
+        if old != new:
+            return min(old.period, new.period)
+    if len(previous) == len(events):
+        return None
+    return (previous if len(previous) > len(events) else events)[min(len(previous), len(events))].period
+
+
+class IncrementalScheduler:
+    """Keeps the last event schedule of each loan so an edited event list only recomputes
+    from the earliest period it affects; the rows before it are reused as they are."""
+
+    def __init__(self, max_size: int = EVENT_CACHE_SIZE):
+        self.cache = LRUCache(max_size)
+        self.reused_periods = 0
+        self.computed_periods = 0
+
+    def schedule(self, principal: float, monthly_rate: float, term_months: int, monthly_payment: float, events) -> EventSchedule:
+        key = (principal, monthly_rate, term_months, monthly_payment)
+        events = sort_events(events)
+        cached = self.cache.get(key)
+        start_period = 1
+        prior = None
+        if cached is not None:
+            previous_events, prior = cached
+            start_period = first_affected_period(previous_events, events)
+            if start_period is None:
+                self.reused_periods += len(prior.rates)
+                return prior
+            if start_period > len(prior.rates):
+                # Only events after the loan was already paid off changed
+                self.cache.put(key, (events, prior))
+                self.reused_periods += len(prior.rates)
+                return prior
+
+        result = amortize_with_events(principal, monthly_rate, term_months, monthly_payment, events, prior, start_period)
+        self.reused_periods += start_period - 1
+        self.computed_periods += len(result.rates) - (start_period - 1)
+        self.cache.put(key, (events, result))
+        return result
+
+    def stats(self) -> dict:
+        return dict(self.cache.stats(), reused_periods=self.reused_periods, computed_periods=self.computed_periods)
+
+
+scheduler = IncrementalScheduler()
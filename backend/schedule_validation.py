@@ -0,0 +1,134 @@
+from functools import lru_cache
+import numpy as np
+from amortization import SCHEDULE_COLUMNS, amortize
+from csv_stream import CsvChunkReader
+
+# Columns are rounded to cents independently, so sums may be a cent apart
+TOLERANCE = 0.01 + 1e-9
+REFERENCE_CACHE_SIZE = 512
+# The uploaded schedule should match the recomputed one to the cent
+DIVERGENCE_TOLERANCE = 0.005
+
+
+class ScheduleValidationError(ValueError):
+    def __init__(self, message: str, row: int | None = None):
+        super().__init__(message if row is None else f"Row {row}: {message}")
+        self.row = row
+
+
+@lru_cache(maxsize=REFERENCE_CACHE_SIZE)
+def reference_schedule(principal: float, monthly_rate: float, term_months: int, monthly_payment: float) -> np.ndarray:
+    """Rows generate_payment_schedule would return, in SCHEDULE_COLUMNS order.
+
+    Memoized so repeated applications for common products skip the recompute;
+    the array is shared between requests and therefore read-only.
+    """
+    if monthly_rate > 0 and monthly_payment <= principal * monthly_rate:
+        raise ScheduleValidationError("Monthly payment is too low to cover the interest.")
+    schedule = amortize(principal, monthly_rate, term_months, monthly_payment)
+    rows = np.column_stack(schedule[:5]).astype(np.float64)
+    rows.flags.writeable = False
+    return rows
+
+
+def first_divergence(reference: np.ndarray, values: np.ndarray, offset: int = 0) -> int | None:
+    """Index into `values` of the first row that differs from the reference, or None.
+
+    `values` holds schedule rows in SCHEDULE_COLUMNS order, starting at row `offset`.
+    Rows past the end of the reference always diverge.
+    """
+    expected = reference[offset:offset + len(values)]
+    bad = np.ones(len(values), dtype=bool)
+    bad[:len(expected)] = (np.abs(values[:len(expected)] - expected) > DIVERGENCE_TOLERANCE).any(axis=1)
+    return int(np.argmax(bad)) if bad.any() else None
+
+
+class ScheduleValidator:
+    """Incremental payment schedule CSV parser.
+
+    Chunks are fed as they arrive and only the trailing partial line is buffered.
+    The complete rows of each chunk are checked against the amortization invariants
+    in one vectorized step, so a bad upload is rejected at the chunk holding its
+    first bad row instead of after the whole body has been read.
+    """
+
+    def __init__(self, reference: np.ndarray | None = None, keep_rows: bool = False):
+        self.reference = reference
+        self.rows = 0
+        # With keep_rows the parsed blocks are kept so the schedule can be stored afterwards
+        self._blocks = [] if keep_rows else None
+        self._reader = CsvChunkReader()
+        self._columns = None
+        self._previous_balance = None
+
+    def feed(self, chunk: bytes):
+        try:
+            records = self._reader.feed(chunk)
+        except ValueError as e:
+            raise ScheduleValidationError(str(e), self.rows + 1)
+        self._check_records(records)
+
+    def close(self) -> int:
+        """Flush the last line and return the number of schedule rows read."""
+        try:
+            records = self._reader.close()
+        except ValueError as e:
+            raise ScheduleValidationError(str(e), self.rows + 1)
+        self._check_records(records)
+        if self._columns is None or self.rows == 0:
+            raise ScheduleValidationError("Payment schedule is empty.")
+        if self.reference is not None and self.rows < len(self.reference):
+            raise ScheduleValidationError("Schedule ends before the loan term.", self.rows + 1)
+        return self.rows
+
+    def _check_records(self, records: list[list[str]]):
+        if self._columns is None:
+            header = self._reader.header
+            if header is None:
+                return
+            missing = [column for column in SCHEDULE_COLUMNS if column not in header]
+            if missing:
+                raise ScheduleValidationError(f"Missing columns: {', '.join(missing)}.")
+            self._columns = [header.index(column) for column in SCHEDULE_COLUMNS]
+
+        if not records:
+            return
+        try:
+            values = np.array([[fields[index] for index in self._columns] for fields in records], dtype=np.float64)
+        except (IndexError, ValueError):
+            raise ScheduleValidationError("Expected a number in every schedule column.", self.rows + self._first_unparsable(records))
+
+        self._check_rows(values)
+        if self._blocks is not None:
+            self._blocks.append(values)
+        self.rows += len(values)
+        self._previous_balance = values[-1, 4]
+
+    def values(self) -> np.ndarray:
+        """The validated rows in SCHEDULE_COLUMNS order; needs keep_rows."""
+        return np.concatenate(self._blocks) if self._blocks else np.empty((0, len(SCHEDULE_COLUMNS)))
+
+    def _first_unparsable(self, records) -> int:
+        # Only reached on the error path, to report the exact row
+        for number, fields in enumerate(records, start=1):
+            try:
+                [float(fields[index]) for index in self._columns]
+            except (IndexError, ValueError):
+                return number
+        return 1
+
+    def _check_rows(self, values: np.ndarray):
+        _, payment, principal, interest, balance = values.T
+        bad = np.abs(principal + interest - payment) > TOLERANCE
+        if bad.any():
+            raise ScheduleValidationError("Principal plus interest does not equal the payment.", self.rows + 1 + int(np.argmax(bad)))
+
+        previous = np.concatenate(([np.inf if self._previous_balance is None else self._previous_balance], balance[:-1]))
+        bad = balance > previous + TOLERANCE
+        if bad.any():
+            raise ScheduleValidationError("Remaining balance increased.", self.rows + 1 + int(np.argmax(bad)))
+
+        if self.reference is not None:
+            divergent = first_divergence(self.reference, values, self.rows)
+            if divergent is not None:
+                raise ScheduleValidationError("Diverges from the recomputed schedule.", self.rows + 1 + divergent)
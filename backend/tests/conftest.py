@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Every store the app opens at import time goes to a throwaway directory, never data/
+_data = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("CUSTOMER_DB_FILE", os.path.join(_data, "customers.db"))
+os.environ.setdefault("APPLICATION_DB_FILE", os.path.join(_data, "applications.db"))
+os.environ.setdefault("HOT_PATH_LOG_RATE", "0")
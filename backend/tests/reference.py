@@ -0,0 +1,49 @@
+"""Slow, obviously correct schedules that the fast engines are tested against.
+
+The benchmarks time the engines against these too; they import them from here, so
+editing a benchmark can never change what the tests check.
+"""
+from fractions import Fraction
+import numpy as np
+from loan_calculation import calculate_monthly_payment
+
+# Annual percentages with awkward decimals, as clients send them
+ANNUAL_RATES = (3.25, 4.0, 5.5, 6.5, 7.1, 12.345, 19.99)
+
+
+def loop_schedule(principal, monthly_rate, term_months, monthly_payment):
+    # The period-by-period loop generate_payment_schedule used before the closed-form engine
+    remaining_balance = np.zeros(term_months + 1)
+    interest_payment = np.zeros(term_months)
+    principal_payment = np.zeros(term_months)
+    remaining_balance[0] = principal
+    for i in range(term_months):
+        interest_payment[i] = round(remaining_balance[i] * monthly_rate, 2)
+        principal_payment[i] = round(monthly_payment - interest_payment[i], 2)
+        if i < term_months - 1:
+            remaining_balance[i + 1] = round(remaining_balance[i] - principal_payment[i], 2)
+    return remaining_balance[1:], interest_payment, principal_payment
+
+
+def random_loan(rng):
+    principal = round(rng.uniform(100, 2_000_000), rng.choice([0, 2]))
+    monthly_rate = rng.choice([0.0, rng.uniform(0.1, 30) / 100 / 12])
+    term_months = rng.randint(1, 480)
+    payment = round(calculate_monthly_payment(principal, monthly_rate, term_months), 2)
+    return principal, monthly_rate, term_months, payment
+
+
+def half_even(value: Fraction) -> int:
+    quotient, remainder = divmod(value, 1)
+    return int(quotient) + (remainder > Fraction(1, 2) or (remainder == Fraction(1, 2) and quotient % 2 == 1))
+
+
+def exact_balances(principal_cents, annual_rate, term_months, payment_cents) -> np.ndarray:
+    # One period at a time with unlimited precision, interest rounded half-even to the cent
+    monthly_rate = Fraction(str(annual_rate)) / 1200
+    balance = principal_cents
+    balances = []
+    for _ in range(term_months - 1):
+        balance -= payment_cents - half_even(balance * monthly_rate)
+        balances.append(balance)
+    return np.array(balances, dtype=np.int64)
@@ -0,0 +1,51 @@
+import asyncio
+import csv
+import io
+import httpx
+import advance_salary
+from csv_stream import MAX_LINE_BYTES
+from main import app
+
+
+def stream(*chunks):
+    # Over ASGI each chunk reaches the app as its own body message, as it would off the network
+    async def body():
+        for chunk in chunks:
+            yield chunk
+
+    async def post():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/api/v2/calculate_salary_advance/batch", content=body(), headers={"Content-Type": "text/csv"})
+
+    return asyncio.run(post())
+
+
+def test_payroll_streams_scored_batches(monkeypatch):
+    monkeypatch.setattr(advance_salary, "PAYROLL_BATCH_ROWS", 2)
+    response = stream(b"name,gross_salary,pay_frequency,requested_amount\n", b"a,5000,monthly,100\nb,5000,weekly,100\n", b"c,0,monthly,100\n")
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["name"] for row in rows] == ["a", "b", "c"]
+    assert [row["eligible"] for row in rows] == ["True", "True", "False"]
+
+
+def test_bad_line_after_streaming_started_ends_with_an_error_row(monkeypatch):
+    monkeypatch.setattr(advance_salary, "PAYROLL_BATCH_ROWS", 2)
+    response = stream(
+        b"name,gross_salary,pay_frequency,requested_amount\n",
+        b"a,5000,monthly,100\nb,5000,weekly,100\nc,5000,monthly,100\n",
+        b"d," + b"9" * (MAX_LINE_BYTES + 1),
+    )
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["name"] for row in rows] == ["a", "b", "c", ""]
+    assert rows[-1]["error"] == "Invalid payroll file: CSV line is too long. No rows after this one were scored."
+
+
+def test_undecodable_bytes_after_streaming_started_end_with_an_error_row(monkeypatch):
+    monkeypatch.setattr(advance_salary, "PAYROLL_BATCH_ROWS", 1)
+    response = stream(b"name,gross_salary,pay_frequency,requested_amount\na,5000,monthly,100\n", b"b,5000,weekly,100\nc,\xff\xfe,monthly,100\n")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    # Rows in front of the bad line are scored even when they arrive in the same chunk
+    assert [row["name"] for row in rows] == ["a", "b", ""]
+    assert rows[-1]["error"].startswith("Invalid payroll file: 'utf-8' codec can't decode")
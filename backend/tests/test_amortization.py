@@ -0,0 +1,32 @@
+import random
+import numpy as np
+import pytest
+from amortization import amortize, iter_amortize
+from tests.reference import loop_schedule, random_loan
+
+
+def loans(cases, seed):
+    rng = random.Random(seed)
+    return [random_loan(rng) for _ in range(cases)]
+
+
+@pytest.mark.parametrize("loan", loans(2000, seed=7))
+def test_amortize_matches_period_by_period_loop(loan):
+    balance, interest, principal = loop_schedule(*loan)
+    schedule = amortize(*loan)
+    # Every period before the payoff matches the loop to the cent
+    assert np.array_equal(schedule.interest, interest)
+    assert np.array_equal(schedule.principal[:-1], principal[:-1])
+    assert np.array_equal(schedule.remaining_balance, balance)
+    # The final period clears the balance brought into it
+    opening = loan[0] if loan[2] == 1 else balance[-2]
+    assert schedule.principal[-1] == opening
+    assert schedule.payment[-1] == round(opening + interest[-1], 2)
+
+
+@pytest.mark.parametrize("loan", loans(50, seed=11))
+def test_iter_amortize_blocks_match_single_call(loan):
+    schedule = amortize(*loan)
+    blocks = list(iter_amortize(*loan, block_size=37))
+    for column, values in zip(schedule[:5], zip(*(block[:5] for block in blocks))):
+        assert np.array_equal(column, np.concatenate(values))
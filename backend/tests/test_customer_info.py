@@ -0,0 +1,34 @@
+import asyncio
+import json
+import httpx
+import customer_info
+from customer_store import SQLiteCustomerStore
+from main import app
+
+
+def customer(i: int) -> dict:
+    return {
+        "full_name": f"Customer {i}",
+        "employment_status": "Employed",
+        "email": f"customer{i:05d}@example.com",
+        "phone_number": "08012345678",
+    }
+
+
+def test_concurrent_exports_page_through_every_customer(tmp_path, monkeypatch):
+    store = SQLiteCustomerStore(str(tmp_path / "customers.db"))
+    store.insert_many_results([customer(i) for i in range(250)])
+    monkeypatch.setattr(customer_info.store, "store", store)
+    monkeypatch.setattr(customer_info, "EXPORT_BATCH", 7)
+
+    async def export_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get("/api/v1/export-customers") for _ in range(16)))
+
+    # Interleaved streams resume their generators on whichever threadpool thread is free
+    responses = asyncio.run(export_all())
+    expected = sorted(customer(i)["email"] for i in range(250))
+    for response in responses:
+        assert response.status_code == 200
+        assert [json.loads(line)["email"] for line in response.text.splitlines()] == expected
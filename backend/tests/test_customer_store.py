@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+from async_customer_store import AsyncCustomerStore
+from customer_store import CustomerStore, SQLiteCustomerStore
+
+
+def test_incomplete_backend_fails_at_construction():
+    class GetOnlyStore(CustomerStore):
+        def get(self, email):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyStore()
+
+
+def test_sqlite_store_round_trip(tmp_path):
+    store = SQLiteCustomerStore(str(tmp_path / "customers.db"))
+    record = {"email": "a@example.com", "name": "A"}
+    assert store.insert(record)
+    assert not store.insert(record)
+    assert store.get("a@example.com") == record
+
+
+def test_async_insert_fails_when_writer_stops(tmp_path):
+    async def scenario():
+        store = AsyncCustomerStore(SQLiteCustomerStore(str(tmp_path / "customers.db")))
+        assert await store.insert({"email": "a@example.com"})
+        waiting = asyncio.ensure_future(store.insert({"email": "b@example.com"}))
+        store._writer_task.cancel()
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(waiting, timeout=5)
+        # A later insert gets a new writer
+        assert await store.insert({"email": "c@example.com"})
+
+    asyncio.run(scenario())
@@ -0,0 +1,51 @@
+import random
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from tests.reference import ANNUAL_RATES, exact_balances
+from exact_amortization import amortize_cents, amortize_exact, to_cents, to_rate_units
+from loan_calculation import calculate_monthly_payment
+from main import app
+
+client = TestClient(app)
+
+
+def loans(cases, seed):
+    rng = random.Random(seed)
+    for _ in range(cases):
+        principal = round(rng.uniform(1_000, 1_000_000), 2)
+        annual_rate = rng.choice(ANNUAL_RATES)
+        term_months = rng.choice((12, 60, 360, 480))
+        payment = round(calculate_monthly_payment(principal, annual_rate / 1200, term_months), 2)
+        yield principal, annual_rate, term_months, payment
+
+
+@pytest.mark.parametrize("loan", list(loans(100, seed=5)))
+def test_cents_match_rational_arithmetic(loan):
+    principal, annual_rate, term_months, payment = loan
+    schedule = amortize_cents(to_cents(principal), to_rate_units(annual_rate / 100 / 12), term_months, to_cents(payment))
+    assert np.array_equal(schedule.remaining_balance[:-1], exact_balances(to_cents(principal), annual_rate, term_months, to_cents(payment)))
+    assert schedule.remaining_balance[-1] == 0
+    # Principal and interest add up to each payment, and the principal to the loan, to the cent
+    assert np.array_equal(schedule.principal + schedule.interest, schedule.payment)
+    assert schedule.principal.sum() == to_cents(principal)
+    assert schedule.total_interest == schedule.interest.sum()
+
+
+def test_rate_and_amounts_are_read_as_written():
+    assert to_cents(0.29) == 29
+    assert to_cents(1_234_567.675) == 123_456_768
+    assert to_rate_units(0.065 / 12) == 6_500_000
+    schedule = amortize_exact(100.0, 0.0, 3, 33.33)
+    assert schedule.payment.tolist() == [33.33, 33.33, 33.34]
+
+
+@pytest.mark.parametrize("loan", [
+    {"principal": 1_000, "monthly_rate": -0.01, "term_months": 12, "monthly_payment": 80},
+    {"principal": 1e17, "monthly_rate": 0.005, "term_months": 12, "monthly_payment": 9e15},
+    {"principal": 1e17, "monthly_rate": 0.0, "term_months": 12, "monthly_payment": 1e16},
+])
+def test_unrepresentable_loans_are_rejected(loan):
+    response = client.post("/api/v4/generate_payment_schedule", params={"money": "exact"}, json=loan)
+    assert response.status_code == 400
+    assert "Exact money mode" in response.json()["detail"]
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from fastapi.testclient import TestClient
+import loan_application
+from application_store import LoanApplicationStore
+from main import app
+
+client = TestClient(app)
+APPLICANT = {"house_ownership": "Yes", "salary_deduction_approval": "Yes", "dependents": 2, "employment_duration": "5 years"}
+
+
+def filled_store(path, count):
+    store = LoanApplicationStore(str(path / "applications.db"))
+    for i in range(count):
+        store.insert(dict(APPLICANT, customer_email=f"customer{i % 3}@example.com", schedule_rows=0, schedule_verified=False))
+    for application_id in range(1, count + 1, 4):
+        store.set_status(application_id, "approved")
+    return store
+
+
+def all_pages(params):
+    ids, before = [], None
+    while True:
+        page = client.get("/api/v5/applications", params=dict(params, before=before) if before else params).json()
+        ids.extend(row["id"] for row in page["applications"])
+        before = page["next_cursor"]
+        if before is None:
+            return ids
+
+
+def test_pages_cover_every_match_once_newest_first(tmp_path, monkeypatch):
+    store = filled_store(tmp_path, 47)
+    monkeypatch.setattr(loan_application, "application_store", lambda: store)
+
+    assert all_pages({"limit": 10}) == list(range(47, 0, -1))
+    assert all_pages({"limit": 5, "customer_email": "customer1@example.com"}) == [i for i in range(47, 0, -1) if (i - 1) % 3 == 1]
+    assert all_pages({"limit": 4, "status": "approved"}) == [i for i in range(47, 0, -1) if (i - 1) % 4 == 0]
+    # A last page that is exactly full is followed by one empty page
+    assert all_pages({"limit": 47}) == list(range(47, 0, -1))
+
+
+def test_submitted_range_is_half_open(tmp_path):
+    store = filled_store(tmp_path, 5)
+    now = datetime.now(timezone.utc)
+    assert len(store.search(submitted_from=now - timedelta(minutes=5))) == 5
+    assert store.search(submitted_to=now - timedelta(minutes=5)) == []
+    assert store.search(submitted_from=now + timedelta(minutes=5)) == []
+
+
+def test_schedule_is_stored_apart_and_round_trips(tmp_path):
+    store = LoanApplicationStore(str(tmp_path / "applications.db"))
+    schedule = np.column_stack([np.arange(1, 4), np.full(3, 10.0), [8.0, 9.0, 10.0], [2.0, 1.0, 0.0], [19.0, 10.0, 0.0]])
+    application_id = store.insert(dict(APPLICANT, schedule_rows=3, schedule_verified=True), schedule)
+    assert np.array_equal(np.column_stack(store.schedule(application_id)[:5]), schedule)
+    assert store.schedule(store.insert(dict(APPLICANT, schedule_rows=0, schedule_verified=False))) is None
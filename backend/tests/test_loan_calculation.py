@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from amortization import amortize
+from loan_calculation import payoff_with_installment, sweep_loans
+from main import app
+
+client = TestClient(app)
+
+
+def test_no_extra_payment_pays_off_in_the_term():
+    rates = np.round(np.arange(0.0, 20.0, 0.25), 10)
+    terms = np.arange(1, 361)
+    grid = sweep_loans(250_000.0, rates, terms, np.array([0.0]))
+    assert np.array_equal(grid["payoff_months"][0], np.broadcast_to(terms, (len(rates), len(terms))))
+    assert np.array_equal(grid["total_interests_with_extra"][0], grid["total_interests"])
+
+
+def test_extra_payment_matches_the_schedule_it_implies():
+    monthly_rate = np.array(0.065 / 12)
+    months, interest = payoff_with_installment(250_000.0, monthly_rate, np.array(2_000.0), np.array(360))
+    schedule = amortize(250_000.0, float(monthly_rate), int(months), 2_000.0)
+    # The schedule rounds interest to the cent each month; the closed form does not
+    assert 0 < schedule.remaining_balance[-2] < 2_000.0
+    assert interest == pytest.approx(schedule.total_interest, abs=1.0)
+
+
+def test_installment_that_never_pays_off_is_rejected():
+    with pytest.raises(ValueError):
+        payoff_with_installment(250_000.0, np.array(0.01), np.array(2_500.0), np.array(360))
+    # The annuity formula overflows for this term, so there is no installment to pay off with
+    response = client.post("/api/v3/calculate_loan/sweep", json={
+        "loan_amount": 250_000.0,
+        "interest_rates": {"start": 6.5, "stop": 6.5, "step": 1},
+        "loan_term_months": {"start": 200_000, "stop": 200_000, "step": 1},
+        "extra_payments": [0.0],
+    })
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("interest_rates", [
+    {"start": 0, "stop": 1e308, "step": 1e-10},
+    {"start": -1e308, "stop": 1e308, "step": 1},
+    {"start": 0, "stop": 1e7, "step": 1},
+])
+def test_oversized_sweep_is_rejected_before_allocating(interest_rates):
+    response = client.post("/api/v3/calculate_loan/sweep", json={
+        "loan_amount": 250_000.0,
+        "interest_rates": interest_rates,
+        "loan_term_months": {"start": 1, "stop": 360, "step": 1},
+    })
+    assert response.status_code == 400
+    assert "the limit is" in response.json()["detail"]
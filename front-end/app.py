@@ -1,9 +1,12 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
+import hashlib
 import re
 import time
-import base64
+
+BACKEND_URL = "http://backend:8000"
 
 # Page Configuration
 st.set_page_config(
@@ -12,6 +15,46 @@ st.set_page_config(
     layout="wide",
 )
 
+# One keep-alive connection pool per server process, shared by every session and rerun
+@st.cache_resource
+def get_http_session():
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+    return session
+
+class BackendError(Exception):
+    """A request the backend rejected; the message is its error detail."""
+
+def post_json(path, payload):
+    # Raising keeps failed requests out of st.cache_data, which only caches returned values;
+    # the calculator forms show the detail through their except blocks
+    response = get_http_session().post(f"{BACKEND_URL}{path}", json=payload)
+    if not response.ok:
+        raise BackendError(response.json().get('detail', 'Unknown error'))
+    return response.json()
+
+def schedule_digest(schedule_csv):
+    return hashlib.sha256(schedule_csv).hexdigest()
+
+# Calculator answers only depend on their inputs, so reruns with the same values skip the backend.
+# Advance results expire sooner since the product table behind them can be edited live.
+@st.cache_data(ttl=60, max_entries=1000, show_spinner=False)
+def calculate_advance(gross_salary, pay_frequency, requested_amount):
+    return post_json("/api/v2/calculate_salary_advance", {
+        "gross_salary": gross_salary,
+        "pay_frequency": pay_frequency,
+        "requested_amount": requested_amount
+    })
+
+@st.cache_data(ttl=3600, max_entries=1000, show_spinner=False)
+def calculate_loan_with_schedule(loan_amount, interest_rate, loan_term):
+    # Quote and columnar schedule in a single round trip
+    return post_json("/api/v3/calculate_loan_with_schedule", {
+        "loan_amount": loan_amount,
+        "interest_rate": interest_rate,
+        "loan_term_months": loan_term
+    })
+
 # Page Header
 col1, col2, col3 = st.columns([1,2,1])
 with col2:
@@ -46,8 +89,8 @@ if customer_submit:
         st.error("Please fill in all required fields and ensure no extra fields are filled if not applicable. No empty fields are allowed.")
     else:
         try:
-            response = requests.post(
-                "http://backend:8000/api/v1/save-customer",
+            response = get_http_session().post(
+                f"{BACKEND_URL}/api/v1/save-customer",
                 json={
                     "full_name": full_name,
                     "employment_status": employment_status,
@@ -60,6 +103,8 @@ if customer_submit:
             if response.ok:
                 st.session_state["show_customer_success"] = True
                 st.session_state["full_name"] = full_name # Store full_name in session state
+                # Its own key, since the email widget owns "customer_email"; links later loan applications to this customer
+                st.session_state["saved_customer_email"] = email
             else:
                 st.error(f"Error saving customer information: {response.json().get('detail', 'Unknown error')}")
         except Exception as e:
@@ -97,31 +142,20 @@ with tab1:
     if submit and gross_salary and requested_amount:
         with st.spinner("Calculating, please wait..."):
             try:
-                response = requests.post(
-                    "http://backend:8000/api/v2/calculate_salary_advance",
-                    json={
-                        "gross_salary": gross_salary,
-                        "pay_frequency": pay_frequency,
-                        "requested_amount": requested_amount
-                    }
-                )
-                if response.ok:
-                    result = response.json()
-                    display_name = st.session_state.get("full_name", "") # Get full_name from session state
-                    if result['eligible']:
-                        st.success(f"Congratulations {display_name}, you are eligible for an advance!")
-                        st.info("Calculation Results")
-                        cols = st.columns(4)
-                        with cols[0]: st.metric("Maximum Advance", f"${result['max_advance']:,.2f}")
-                        with cols[1]: st.metric("Approved Amount", f"${result['approved_amount']:,.2f}")
-                        with cols[2]: st.metric("Fee", f"${result['fee']:,.2f}")
-                        with cols[3]: st.metric("Total Repayable", f"${result['total_repayable']:,.2f}")
-                        st.write("You can proceed to request the advance amount in the loan application form.")
-                    else:
-                        st.warning(f"⚠️ Apologies {display_name}, your requested amount ${requested_amount:,.2f} exceeds the maximum advance available.")
-                        st.warning(f"Maximum Advance Available: ${result['max_advance']:,.2f}")
+                result = calculate_advance(gross_salary, pay_frequency, requested_amount)
+                display_name = st.session_state.get("full_name", "") # Get full_name from session state
+                if result['eligible']:
+                    st.success(f"Congratulations {display_name}, you are eligible for an advance!")
+                    st.info("Calculation Results")
+                    cols = st.columns(4)
+                    with cols[0]: st.metric("Maximum Advance", f"${result['max_advance']:,.2f}")
+                    with cols[1]: st.metric("Approved Amount", f"${result['approved_amount']:,.2f}")
+                    with cols[2]: st.metric("Fee", f"${result['fee']:,.2f}")
+                    with cols[3]: st.metric("Total Repayable", f"${result['total_repayable']:,.2f}")
+                    st.write("You can proceed to request the advance amount in the loan application form.")
                 else:
-                    st.error(f"Error calculating advance: {response.json().get('detail', 'Unknown error')}")
+                    st.warning(f"⚠️ Apologies {display_name}, your requested amount ${requested_amount:,.2f} exceeds the maximum advance available.")
+                    st.warning(f"Maximum Advance Available: ${result['max_advance']:,.2f}")
             except Exception as e:
                 st.error(f"Error calculating advance: {str(e)}")
 
@@ -148,51 +182,36 @@ with tab2:
     if submit and loan_amount and interest_rate and loan_term:
         with st.spinner("Calculating, please wait..."):
             try:
-                response = requests.post(
-                    "http://backend:8000/api/v3/calculate_loan",
-                    json={
-                        "loan_amount": loan_amount,
-                        "interest_rate": interest_rate,
-                        "loan_term_months": loan_term
-                    }
+                result = calculate_loan_with_schedule(loan_amount, interest_rate, loan_term)
+                quote = result['quote']
+                schedule = result['schedule']
+                display_name = st.session_state.get("full_name", "") # Get full_name from session state
+                st.success(f"Congratulations {display_name}, your loan calculation is complete!")
+                st.info("Calculation Results")
+                cols = st.columns(3)
+                with cols[0]: st.metric("Monthly Payment", f"${quote['monthly_payment']:,.2f}")
+                with cols[1]: st.metric("Total Interest", f"${quote['total_interest']:,.2f}")
+                with cols[2]: st.metric("Total Payment", f"${quote['total_payment']:,.2f}")
+
+                st.subheader("Payment Schedule")
+                df = pd.DataFrame(schedule['columns'])
+                st.dataframe(df, use_container_width=True)
+                csv = df.to_csv(index=False)
+                # Remember which loan each downloaded schedule belongs to, so the backend can verify
+                # an upload against the parameters it was actually generated with
+                st.session_state.setdefault("schedule_parameters", {})[schedule_digest(csv.encode())] = {
+                    "principal": loan_amount,
+                    "monthly_rate": interest_rate / 100 / 12,
+                    "term_months": loan_term,
+                    "monthly_payment": quote['monthly_payment']
+                }
+                st.markdown("Download the payment schedule as CSV and submit it in your loan application.")
+                st.download_button(
+                    label="Download Payment Schedule",
+                    data=csv,
+                    file_name='payment_schedule.csv',
+                    mime='text/csv'
                 )
-                if response.ok:
-                    result = response.json()
-                    display_name = st.session_state.get("full_name", "") # Get full_name from session state
-                    st.success(f"Congratulations {display_name}, your loan calculation is complete!")
-                    st.info("Calculation Results")
-                    cols = st.columns(3)
-                    with cols[0]: st.metric("Monthly Payment", f"${result['monthly_payment']:,.2f}")
-                    with cols[1]: st.metric("Total Interest", f"${result['total_interest']:,.2f}")
-                    with cols[2]: st.metric("Total Payment", f"${result['total_payment']:,.2f}")
-                    
-                    # Get payment schedule
-                    schedule_response = requests.post(
-                        "http://backend:8000/api/v4/generate_payment_schedule",
-                        json={
-                            "principal": loan_amount,
-                            "monthly_rate": interest_rate / 100 / 12,
-                            "term_months": loan_term,
-                            "monthly_payment": result['monthly_payment']
-                        }
-                    )
-                    if schedule_response.ok:
-                        schedule = schedule_response.json()
-                        st.subheader("Payment Schedule")
-                        df = pd.DataFrame(schedule['schedule'])
-                        st.dataframe(df, use_container_width=True)
-                        csv = df.to_csv(index=False)
-                        st.markdown("Download the payment schedule as CSV and submit it in your loan application.")
-                        st.download_button(
-                            label="Download Payment Schedule",
-                            data=csv,
-                            file_name='payment_schedule.csv',
-                            mime='text/csv'
-                        )
-                    else:
-                        st.error(f"Error generating payment schedule: {schedule_response.json().get('detail', 'Unknown error')}")
-                else:
-                    st.error(f"Error calculating loan: {response.json().get('detail', 'Unknown error')}")
             except Exception as e:
                 st.error(f"Error calculating loan: {str(e)}")
 
@@ -221,19 +240,24 @@ with tab3:
             st.error("Please answer all questions and upload the payment schedule.")
         else:
             try:
-                # Read and base64 encode the uploaded CSV file
-                csv_content = uploaded_file.getvalue().decode("utf-8")
-                encoded_csv = base64.b64encode(csv_content.encode("utf-8")).decode("utf-8")
-
-                response = requests.post(
-                    "http://backend:8000/api/v5/submit_loan_application",
-                    json={
+                # Send the uploaded CSV as the raw request body so the backend can validate it as it streams in.
+                # Only a schedule generated in this session comes with loan parameters to check it against
+                schedule_csv = uploaded_file.getvalue()
+                loan_parameters = st.session_state.get("schedule_parameters", {}).get(schedule_digest(schedule_csv), {})
+                if not loan_parameters:
+                    st.info("This schedule was not generated by the Loan Calculator in this session, so it is submitted without checking it against a loan.")
+                response = get_http_session().post(
+                    f"{BACKEND_URL}/api/v5/submit_loan_application/stream",
+                    params={
                         "house_ownership": house_ownership,
                         "salary_deduction_approval": salary_deduction_approval,
                         "dependents": dependents,
                         "employment_duration": employment_duration,
-                        "payment_schedule_csv": encoded_csv
-                    }
+                        "customer_email": st.session_state.get("saved_customer_email"),
+                        **loan_parameters
+                    },
+                    data=schedule_csv,
+                    headers={"Content-Type": "text/csv"}
                 )
                 if response.ok:
                     st.success(response.json()["message"])